@@ -0,0 +1,192 @@
+"""
+Escriptures atòmiques i segures davant d'interrupcions
+
+Tots els fitxers que llegeixen altres processos (latest_weather.json, el banner,
+els feeds, les caches) s'escriuen a un temporal del mateix directori, es fa
+fsync i es renomenen sobre el destí. Un lector veu sempre el fitxer anterior
+sencer o el nou sencer, mai un fitxer a mitges.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+class AtomicFile:
+    """
+    Context manager que escriu a un temporal i el renomena en sortir sense errors
+
+    Amb only_if_changed=True, si el contingut final és idèntic al del fitxer
+    existent, el temporal es descarta i el destí no es toca (changed = False).
+
+        with AtomicFile('feed.xml', 'wb', only_if_changed=True) as f:
+            f.write(...)
+    """
+
+    def __init__(self, path, mode='wb', encoding=None, only_if_changed=False, fsync=True):
+        self.path = path
+        self.mode = mode
+        self.encoding = encoding or (None if 'b' in mode else 'utf-8')
+        self.only_if_changed = only_if_changed
+        self.fsync = fsync
+        self.changed = False
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(self.path)}.",
+                                              suffix='.tmp')
+        self._file = os.fdopen(fd, self.mode, encoding=self.encoding)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            self._file.close()
+            if exc_type is not None:
+                return False
+            if self.only_if_changed and _same_content(self._tmp_path, self.path):
+                return False
+            _copy_mode(self.path, self._tmp_path)
+            os.replace(self._tmp_path, self.path)
+            self._tmp_path = None
+            self.changed = True
+            if self.fsync:
+                _fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+            return False
+        finally:
+            if self._tmp_path and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+def _same_content(path_a, path_b):
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+            while True:
+                chunk_a, chunk_b = a.read(65536), b.read(65536)
+                if chunk_a != chunk_b:
+                    return False
+                if not chunk_a:
+                    return True
+    except OSError:
+        return False
+
+def _copy_mode(existing, tmp_path):
+    """mkstemp crea el fitxer amb permisos 0600: es mantenen els del destí (o 0644)"""
+    try:
+        mode = os.stat(existing).st_mode & 0o777
+    except OSError:
+        mode = 0o644
+    try:
+        os.chmod(tmp_path, mode)
+    except OSError:
+        pass
+
+def _fsync_directory(directory):
+    """Fa persistent el rename (només POSIX; a Windows no es pot obrir un directori)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_bytes(path, data, only_if_changed=False, fsync=True):
+    """
+    Escriu bytes de forma atòmica
+
+    Args:
+        fsync: False per a caches (si es perden, només cal tornar-les a calcular)
+
+    Returns:
+        True si el fitxer s'ha escrit (False si only_if_changed i era idèntic)
+    """
+    if only_if_changed and _file_equals(path, data):
+        return False
+    atomic = AtomicFile(path, 'wb', fsync=fsync)
+    with atomic as f:
+        f.write(data)
+    return atomic.changed
+
+def write_text(path, text, encoding='utf-8', only_if_changed=False, fsync=True):
+    return write_bytes(path, text.encode(encoding), only_if_changed, fsync)
+
+def write_if_changed(path, content, encoding='utf-8'):
+    """
+    Escriu el fitxer (atòmicament) només si el contingut és diferent del que ja hi ha
+
+    Returns:
+        True si s'ha escrit, False si ja era idèntic
+    """
+    data = content.encode(encoding) if isinstance(content, str) else content
+    return write_bytes(path, data, only_if_changed=True)
+
+def _file_equals(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def dumps_json(obj):
+    """JSON compacte (sense espais ni sagnat) per als fitxers que llegeixen màquines"""
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+def write_json(path, obj, pretty_path=None, only_if_changed=False, fsync=True):
+    """
+    Desa JSON compacte de forma atòmica i, opcionalment, una còpia sagnada per a humans
+
+    Returns:
+        True si el fitxer principal s'ha escrit
+    """
+    written = write_text(path, dumps_json(obj), only_if_changed=only_if_changed, fsync=fsync)
+    if pretty_path:
+        write_text(pretty_path, json.dumps(obj, ensure_ascii=False, indent=2), only_if_changed=True)
+    return written
+
+def link_or_copy(source, destination):
+    """
+    Fa que destination tingui el mateix contingut que source sense tornar-lo a escriure:
+    hardlink creat al costat i renomenat sobre el destí (atòmic). Si el sistema de
+    fitxers no admet hardlinks, còpia atòmica.
+
+    Returns:
+        True si destination ha canviat
+    """
+    try:
+        if os.path.samefile(source, destination):
+            return False
+    except OSError:
+        pass
+    if _same_content(source, destination):
+        return False
+
+    directory = os.path.dirname(os.path.abspath(destination))
+    tmp_path = os.path.join(directory, f".{os.path.basename(destination)}.link.tmp")
+    try:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        os.link(source, tmp_path)
+    except (OSError, AttributeError):
+        with open(source, 'rb') as f:
+            atomic = AtomicFile(destination, 'wb')
+            with atomic as out:
+                shutil.copyfileobj(f, out)
+        return True
+    os.replace(tmp_path, destination)
+    _fsync_directory(directory)
+    return True
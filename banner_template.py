@@ -0,0 +1,159 @@
+"""
+Plantilla del banner precompilada amb slots amb nom
+
+banner_news_channel.html s'analitza una sola vegada i es divideix en trossos
+fixos i slots:
+    - 'stations': el contingut del <div class="scroll-container"> (o, si no hi és,
+      el comentari "EL CONTINGUT D'AQUÍ ES REEMPLAÇARÀ...")
+    - qualsevol marcador <!-- SLOT:nom --> que hi hagi a la plantilla
+
+El render és un únic ''.join() dels trossos i els valors dels slots, lineal amb
+el nombre d'estacions. La plantilla compilada es desa a TEMPLATE_CONFIG['cache_file']
+indexada pel hash (sha1) del contingut, de manera que serveix també després d'un
+checkout nou (el mtime canvia però el contingut no), i també es manté en memòria.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import atomic_io
+import config_banner as cfg
+
+STATIONS_SLOT = 'stations'
+SCROLL_MARKER = '<div class="scroll-container">'
+PLACEHOLDER = '<!-- EL CONTINGUT D\'AQUÍ ES REEMPLAÇARÀ COMPLETAMENT PER update_banner.py -->'
+SLOT_RE = re.compile(r'<!--\s*SLOT:(\w+)\s*-->')
+DIV_TAG_RE = re.compile(r'<div\b|</div>')
+CACHE_VERSION = 2
+
+_compiled = {}
+
+class TemplateError(ValueError):
+    """La plantilla no té on inserir les estacions"""
+
+class CompiledTemplate:
+    """
+    Plantilla dividida en trossos fixos i slots
+
+    parts té sempre un element més que slots: parts[0], slots[0], parts[1], ...
+    """
+
+    def __init__(self, parts, slots):
+        self.parts = parts
+        self.slots = slots
+
+    def render(self, **values):
+        """
+        Omple els slots i retorna l'HTML
+
+        Cada valor pot ser un str o un iterable de str (p. ex. la llista de blocs
+        de les estacions). Els slots sense valor queden buits.
+        """
+        output = []
+        for part, slot in zip(self.parts, self.slots):
+            output.append(part)
+            value = values.get(slot, '')
+            if isinstance(value, str):
+                output.append(value)
+            else:
+                output.extend(value)
+        output.append(self.parts[-1])
+        return ''.join(output)
+
+    def to_dict(self):
+        return {'parts': self.parts, 'slots': self.slots}
+
+def _scroll_content_span(html):
+    """Posicions (inici, final) del contingut del scroll-container, o None"""
+    start = html.find(SCROLL_MARKER)
+    if start == -1:
+        return None
+    content_start = start + len(SCROLL_MARKER)
+
+    depth = 1
+    for match in DIV_TAG_RE.finditer(html, content_start):
+        depth += 1 if match.group() != '</div>' else -1
+        if depth == 0:
+            return content_start, match.start()
+    return None
+
+def compile_template(html):
+    """
+    Divideix l'HTML de la plantilla en trossos i slots
+
+    Raises:
+        TemplateError si no es troba on van les estacions
+    """
+    spans = []
+    span = _scroll_content_span(html)
+    if span:
+        spans.append((span[0], span[1], STATIONS_SLOT))
+    else:
+        start = html.find(PLACEHOLDER)
+        if start == -1:
+            raise TemplateError("No s'ha trobat el scroll-container ni el marcador de contingut")
+        spans.append((start, start + len(PLACEHOLDER), STATIONS_SLOT))
+
+    for match in SLOT_RE.finditer(html):
+        if not any(begin <= match.start() < end for begin, end, _ in spans):
+            spans.append((match.start(), match.end(), match.group(1)))
+    spans.sort()
+
+    parts, slots, position = [], [], 0
+    for begin, end, name in spans:
+        parts.append(html[position:begin])
+        slots.append(name)
+        position = end
+    parts.append(html[position:])
+    return CompiledTemplate(parts, slots)
+
+def _read_disk_cache(cache_file, key):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('version') != CACHE_VERSION or cached.get('key') != key:
+        return None
+    return CompiledTemplate(cached['parts'], cached['slots'])
+
+def _write_disk_cache(cache_file, key, template):
+    try:
+        atomic_io.write_json(cache_file, dict(template.to_dict(), version=CACHE_VERSION, key=key), fsync=False)
+    except OSError:
+        pass  # La caché és opcional
+
+def load_template(template_file=None, cache_file=None):
+    """
+    Retorna la plantilla compilada, reutilitzant la de memòria (mateix mtime i
+    mida) o la de disc (mateix contingut)
+
+    Raises:
+        OSError si no es pot llegir la plantilla, TemplateError si no és vàlida
+    """
+    template_file = os.path.abspath(template_file or cfg.HTML_TEMPLATE)
+    if cache_file is None:
+        cache_file = getattr(cfg, 'TEMPLATE_CONFIG', {}).get('cache_file')
+
+    stat = os.stat(template_file)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+
+    memo = _compiled.get(template_file)
+    if memo and memo[0] == stat_key:
+        return memo[1]
+
+    with open(template_file, 'rb') as f:
+        content = f.read()
+    key = hashlib.sha1(content).hexdigest()
+
+    template = _read_disk_cache(cache_file, key) if cache_file else None
+    if template is None:
+        # Salts de línia universals, com en llegir en mode text
+        template = compile_template(content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n'))
+        if cache_file:
+            _write_disk_cache(cache_file, key, template)
+
+    _compiled[template_file] = (stat_key, template)
+    return template
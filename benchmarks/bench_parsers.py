@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DELS BACKENDS D'ANÀLISI HTML
+Compara temps d'anàlisi i memòria màxima per pàgina sobre un corpus de pàgines d'estació
+
+Ús:
+    python benchmarks/bench_parsers.py --record      # Desa les pàgines de STATIONS a benchmarks/corpus/
+    python benchmarks/bench_parsers.py               # Executa el benchmark sobre el corpus
+    python benchmarks/bench_parsers.py --repeat 20 --corpus altre_directori
+
+Nota: tracemalloc només veu la memòria reservada per Python; les estructures
+internes de lxml/selectolax (C) no hi compten.
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parsers
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+def record_corpus(corpus_dir):
+    """Descarrega la pàgina de cada estació activa i la desa tal com arriba"""
+    import config_banner as cfg
+    import http_session
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    session = http_session.create_session(pool_size=1)
+    saved = 0
+    try:
+        for station in cfg.STATIONS:
+            base_url = cfg.SCRAPER_CONFIG.get('base_url', 'https://www.meteo.cat').rstrip('/')
+            url = f"{base_url}/observacions/xema/dades?codi={station['code']}"
+            try:
+                response = session.get(url, timeout=http_session.get_timeout())
+                response.raise_for_status()
+            except Exception as e:
+                print(f"⚠️  {station['code']}: {e}")
+                continue
+            with open(os.path.join(corpus_dir, f"{station['code']}.html"), 'wb') as f:
+                f.write(response.content)
+            saved += 1
+            time.sleep(1)
+    finally:
+        session.close()
+    print(f"✅ {saved} pàgines desades a {corpus_dir}")
+
+def load_corpus(corpus_dir):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.htm*'))):
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+def bench_backend(backend, pages, repeat):
+    """Temps (ms) i memòria màxima (KB) per pàgina d'un backend"""
+    parse = html_parsers.BACKENDS[backend]
+    times = []
+    peaks = []
+    tables = 0
+
+    for _, content in pages:
+        # Memòria: una passada amb tracemalloc
+        tracemalloc.start()
+        extract = parse(content)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        tables += 1 if extract.has_table else 0
+
+        # Temps: millor de N passades sense tracemalloc
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(content)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+
+    return {
+        'backend': backend,
+        'pages': len(pages),
+        'tables_found': tables,
+        'parse_ms_median': round(statistics.median(times), 3),
+        'parse_ms_max': round(max(times), 3),
+        'peak_kb_median': round(statistics.median(peaks), 1),
+        'peak_kb_max': round(max(peaks), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dels backends d'anàlisi HTML")
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Directori amb pàgines .html')
+    parser.add_argument('--record', action='store_true', help='Desa les pàgines de meteo.cat al corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticions per pàgina (es pren la millor)')
+    parser.add_argument('--json', action='store_true', help='Sortida en JSON')
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.corpus)
+        return 0
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"❌ No hi ha pàgines a {args.corpus}")
+        print("   Executa primer: python benchmarks/bench_parsers.py --record")
+        return 1
+
+    results = [bench_backend(backend, pages, args.repeat) for backend in html_parsers.available_backends()]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"📊 {len(pages)} pàgines, millor de {args.repeat} passades")
+    print(f"{'Backend':<12} {'Taules':>7} {'ms (med)':>10} {'ms (max)':>10} {'KB (med)':>10} {'KB (max)':>10}")
+    for r in results:
+        print(f"{r['backend']:<12} {r['tables_found']:>7} {r['parse_ms_median']:>10} {r['parse_ms_max']:>10} "
+              f"{r['peak_kb_median']:>10} {r['peak_kb_max']:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
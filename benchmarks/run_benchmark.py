@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DE LA PIPELINE SENCERA SENSE TOCAR METEO.CAT
+Arrenca benchmarks/stub_server.py dins del procés, hi apunta el scraper
+(METEOCAT_BASE_URL) i executa scraping + generadors del banner en un
+directori temporal (les dades i caches del repositori no es toquen).
+
+Ús:
+    python benchmarks/bench_parsers.py --record                 # Un cop: grava el corpus
+    python benchmarks/run_benchmark.py                          # JSON per stdout
+    python benchmarks/run_benchmark.py --latency 150 --jitter 50 --error-rate 0.05 \\
+        --workers 8 --runs 3 --output bench.json
+    python benchmarks/run_benchmark.py --source api             # API de la XEMA del servidor local
+
+La primera passada és en fred (sense caché HTTP ni dades anteriors); les
+següents reutilitzen el directori i mesuren les peticions condicionals (304).
+Per comparar entre commits, desar el JSON de cada commit i comparar
+stations_per_s, latency_ms i stages.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import CORPUS_DIR, StubServer, load_pages
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def peak_rss_kb():
+    """Memòria resident màxima del procés (KB), o None si no es pot saber"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS en bytes, Linux en KB
+
+def percentile(values, fraction):
+    """Percentil pel mètode del rang més proper"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def isolate_config(cfg, work_dir):
+    """Redirigeix al directori de treball tots els fitxers de dades, caches i sortides"""
+    def relocate(path):
+        if isinstance(path, str) and path.startswith(cfg.BASE_DIR + os.sep):
+            return work_dir + path[len(cfg.BASE_DIR):]
+        return path
+
+    for name in dir(cfg):
+        value = getattr(cfg, name)
+        if name.endswith('_CONFIG') and isinstance(value, dict):
+            for key in value:
+                value[key] = relocate(value[key])
+    for name in ('DATA_DIR', 'LATEST_DATA_FILE', 'HISTORICAL_DIR', 'OUTPUT_HTML'):
+        setattr(cfg, name, relocate(getattr(cfg, name)))
+    os.makedirs(cfg.DATA_DIR, exist_ok=True)
+
+def run_once(modules, args, work_dir):
+    """Una passada: scraping (o API), desat de dades, render dels dos generadors i escriptura"""
+    meteo_scraper, generate_banner, update_banner = modules
+    import data_sources
+    import instrumentation
+    from fragment_cache import FragmentCache
+    from render_context import RenderContext
+
+    latencies = []
+    process_station = meteo_scraper.process_station
+
+    def timed_process_station(*a, **kw):
+        start = time.perf_counter()
+        try:
+            return process_station(*a, **kw)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    timer = instrumentation.RunMetrics()
+    meteo_scraper.process_station = timed_process_station
+    try:
+        with timer.stage('scrape'):
+            data = data_sources.get_source(args.source, args.workers, args.rps, resume=False).fetch()
+    finally:
+        meteo_scraper.process_station = process_station
+
+    with timer.stage('store'):
+        meteo_scraper.save_data(data)
+
+    with timer.stage('render'):
+        template = generate_banner.load_template(os.path.join(ROOT_DIR, 'banner_news_channel.html'))
+        fragment_cache = FragmentCache(version=generate_banner.FRAGMENT_VERSION).load()
+        context = RenderContext()
+        feed, previous_feed = generate_banner.prepare_feed(data, template, context)
+        html, _ = generate_banner.render_banner(data, template, fragment_cache, context, feed)
+
+    with timer.stage('render_update_banner'):
+        update_banner.generate_banner_html(data, context)
+
+    with timer.stage('write'):
+        generate_banner.write_banner(html, os.path.join(work_dir, 'banner_output.html'),
+                                     os.path.join(work_dir, 'index.html'), feed, previous_feed,
+                                     fragment_cache)
+        fragment_cache.save()
+
+    stations = len(data['stations'])
+    # Amb l'API no hi ha peticions per estació: comptem les estacions obtingudes
+    fetched = len(latencies) if args.source == 'web' else stations
+    scrape_seconds = timer.stages['scrape']
+    return {
+        'stations': stations,
+        'fetched': fetched,
+        'success': sum(1 for station in data['stations'].values() if station['success']),
+        'stations_per_s': round(fetched / scrape_seconds, 2) if scrape_seconds else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 2) if latencies else None,
+            'p95': round(percentile(latencies, 0.95), 2) if latencies else None,
+            'max': round(max(latencies), 2) if latencies else None
+        },
+        'stages': timer.stages,
+        'total_s': round(sum(timer.stages.values()), 4),
+        'http_cache': data['metadata'].get('http_cache'),
+        'connections': data['metadata'].get('connections'),
+        'api': data['metadata'].get('api'),
+        'peak_rss_kb': peak_rss_kb()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la pipeline contra un meteo.cat local')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Directori amb pàgines .html')
+    parser.add_argument('--runs', type=int, default=2, help='Passades (la primera en fred)')
+    parser.add_argument('--workers', type=int, default=None, help='Fils del scraper (per defecte SCRAPER_CONFIG)')
+    parser.add_argument('--rps', type=float, default=0, help='Peticions per segon (0 = sense límit)')
+    parser.add_argument('--latency', type=float, default=50.0, help='Latència del servidor (ms)')
+    parser.add_argument('--jitter', type=float, default=20.0, help='Variació de la latència (± ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Proporció de respostes 503 (0-1)')
+    parser.add_argument('--no-304', action='store_true', help='El servidor ignora les peticions condicionals')
+    parser.add_argument('--scheduler', action='store_true',
+                        help='Mantenir el planificador (per defecte es descarreguen totes les estacions)')
+    parser.add_argument('--source', choices=('web', 'api'), default='web',
+                        help="Scraping de pàgines (web) o consultes massives a l'API (api)")
+    parser.add_argument('--seed', type=int, default=1, help='Llavor per a latència i errors')
+    parser.add_argument('--output', default=None, help='Fitxer JSON de resultats (per defecte stdout)')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar els logs de la pipeline')
+    args = parser.parse_args()
+
+    pages = load_pages(args.corpus)
+    if not pages:
+        print(f"❌ No hi ha pàgines a {args.corpus}", file=sys.stderr)
+        print("   Executa primer: python benchmarks/bench_parsers.py --record", file=sys.stderr)
+        return 1
+
+    server = StubServer(pages, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        not_modified=not args.no_304, seed=args.seed, api_key='bench').start()
+    # Abans d'importar config_banner: SCRAPER_CONFIG['base_url'], METEOcat_CONFIG['api_base']
+    # i API_KEY llegeixen les variables d'entorn
+    os.environ['METEOCAT_BASE_URL'] = server.base_url
+    os.environ['METEOCAT_API_BASE'] = f"{server.base_url}/xema/v1"
+    os.environ['METEOCAT_API_KEY'] = 'bench'
+
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='meteo_bench_')
+    os.chdir(work_dir)  # scraper.log i data/ són relatius al directori actual
+    try:
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            import config_banner as cfg
+            isolate_config(cfg, work_dir)
+            if not args.scheduler:
+                cfg.SCHEDULER_CONFIG['enabled'] = False
+            import meteo_scraper
+            import generate_banner
+            import update_banner
+        if args.verbose:
+            import logging_config
+            logging_config.configure_logging()
+        else:
+            logging.disable(logging.CRITICAL)
+
+        runs = []
+        for run in range(args.runs):
+            print(f"⏱️  Passada {run + 1}/{args.runs}...", file=sys.stderr)
+            requests_before = dict(server.stats)
+            with (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())):
+                result = run_once((meteo_scraper, generate_banner, update_banner), args, work_dir)
+            result['run'] = run + 1
+            result['server'] = {key: server.stats[key] - requests_before[key] for key in server.stats}
+            runs.append(result)
+    finally:
+        server.stop()
+        os.chdir(cwd)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus_pages': len(pages),
+        'settings': {
+            'runs': args.runs, 'workers': args.workers, 'rps': args.rps, 'latency_ms': args.latency,
+            'jitter_ms': args.jitter, 'error_rate': args.error_rate, 'not_modified': not args.no_304,
+            'scheduler': args.scheduler, 'source': args.source, 'seed': args.seed
+        },
+        'work_dir': work_dir,
+        'peak_rss_kb': peak_rss_kb(),
+        'runs': runs
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"✅ Resultats desats a {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+SERVIDOR LOCAL QUE FA DE METEO.CAT
+Serveix les pàgines d'estació d'un corpus gravat (benchmarks/corpus/, veure
+bench_parsers.py --record) amb latència, jitter, errors i 304 configurables.
+
+També fa d'API de la XEMA (consultes massives per variable i dia, veure
+data_sources.MeteocatApiSource) amb lectures sintètiques cada 30 minuts per a
+les estacions actives de stations.json.
+
+Ús:
+    python benchmarks/stub_server.py --port 8765 --latency 120 --jitter 40 --error-rate 0.05
+    METEOCAT_BASE_URL=http://127.0.0.1:8765 python pipeline.py
+    METEOCAT_API_BASE=http://127.0.0.1:8765/xema/v1 METEOCAT_API_KEY=stub python pipeline.py --source api
+
+    Estació sense pàgina pròpia al corpus: se li assigna una de les gravades
+    (sempre la mateixa per a cada codi).
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+STATION_PATH = '/observacions/xema/dades'
+API_PATH = '/xema/v1/variables/mesurades/'
+STATIONS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'stations.json')
+
+def load_pages(corpus_dir):
+    """Pàgines del corpus per codi d'estació (nom del fitxer fins al primer '_' o '.')"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.htm*'))):
+        code = os.path.basename(path).split('.')[0].split('_')[0]
+        with open(path, 'rb') as f:
+            pages.setdefault(code, f.read())
+    return pages
+
+def load_station_codes(path=STATIONS_FILE):
+    """Codis de les estacions actives de stations.json"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [station['code'] for station in json.load(f)['stations'] if station.get('active', True)]
+    except (OSError, ValueError, KeyError):
+        return []
+
+def api_readings(code, variable, day, until=None):
+    """
+    Lectures semihoràries sintètiques (sempre les mateixes per estació, variable i dia)
+    en el format de l'API de la XEMA; només fins a 'until' si el dia encara no ha acabat
+    """
+    rng = random.Random(f"{code}:{variable}:{day.isoformat()}")
+    base = rng.uniform(2, 18)
+    amplitude = rng.uniform(3, 9)
+    rainy = rng.random() < 0.3
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    readings = []
+    for slot in range(48):
+        moment = start + timedelta(minutes=30 * slot)
+        if until and moment > until:
+            break
+        if variable == 35:
+            value = round(rng.choice((0.0, 0.0, 0.2, 0.4, 1.1)), 1) if rainy else 0.0
+        else:
+            # Mínim cap a les 2 h UTC, màxim cap a les 14 h
+            value = round(base + amplitude * math.sin((slot / 2 - 8) * math.pi / 12), 1)
+        readings.append({'data': moment.strftime('%Y-%m-%dT%H:%MZ'), 'valor': value, 'estat': 'V',
+                         'baseHoraria': 'SH'})
+    return readings
+
+class StubServer:
+    """
+    Servidor HTTP en un fil, per executar-lo dins d'un altre procés (run_benchmark.py)
+
+    Args:
+        latency: ms d'espera abans de cada resposta
+        jitter: variació màxima (± ms) de la latència
+        error_rate: proporció de respostes 503
+        not_modified: respondre 304 a les peticions condicionals amb l'ETag vigent
+        api_stations: codis d'estació de les respostes de l'API (per defecte les actives)
+        api_key: clau que ha de portar la capçalera X-Api-Key (None: qualsevol;
+                 sense capçalera 401, amb una altra clau 403)
+    """
+
+    def __init__(self, pages, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 not_modified=True, seed=None, api_stations=None, api_key=None):
+        if not pages:
+            raise ValueError("El corpus és buit")
+        self.api_stations = api_stations if api_stations is not None else load_station_codes()
+        self.api_key = api_key
+        self.pages = pages
+        self.codes = sorted(pages)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_modified = not_modified
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'ok': 0, 'not_modified': 0, 'errors': 0, 'not_found': 0, 'bytes': 0,
+                      'api': 0, 'unauthorized': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_for(self, code):
+        if code in self.pages:
+            return self.pages[code]
+        index = int(hashlib.sha1(code.encode('utf-8')).hexdigest(), 16) % len(self.codes)
+        return self.pages[self.codes[index]]
+
+    def api_body(self, variable, day):
+        """Resposta de /variables/mesurades/{variable}/{any}/{mes}/{dia}"""
+        now = datetime.now(timezone.utc)
+        if day > now.date():
+            return None
+        stations = [
+            {'codi': code, 'variables': [{'codi': variable, 'lectures': api_readings(code, variable, day, now)}]}
+            for code in self.api_stations
+        ]
+        return json.dumps(stations).encode('utf-8')
+
+    def _count(self, key, size=0, api=False):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+            self.stats['bytes'] += size
+            if api:
+                self.stats['api'] += 1
+
+    def _draw(self):
+        """Latència (s) i si la resposta ha de ser un error"""
+        with self._lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)) / 1000
+            failed = self.random.random() < self.error_rate
+        return delay, failed
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Capçaleres i cos van en escriptures separades: sense això, Nagle + ACK
+            # retardat del client afegeixen ~40 ms a cada descàrrega
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.startswith(API_PATH):
+                    self._api(url.path[len(API_PATH):])
+                    return
+                code = parse_qs(url.query).get('codi', [''])[0]
+                if url.path != STATION_PATH or not code:
+                    stub._count('not_found')
+                    self._reply(404)
+                    return
+
+                delay, failed = stub._draw()
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    stub._count('errors')
+                    self._reply(503)
+                    return
+
+                body = stub.page_for(code)
+                etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                if stub.not_modified and self.headers.get('If-None-Match') == etag:
+                    stub._count('not_modified')
+                    self._reply(304, headers={'ETag': etag})
+                    return
+                stub._count('ok', len(body))
+                self._reply(200, body, {'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'})
+
+            def _api(self, path):
+                # Sense clau: 401; clau incorrecta: 403
+                key = self.headers.get('X-Api-Key')
+                if stub.api_key and key != stub.api_key:
+                    stub._count('unauthorized', api=True)
+                    self._reply(403 if key else 401)
+                    return
+                try:
+                    variable, year, month, day = (int(part) for part in path.strip('/').split('/'))
+                    body = stub.api_body(variable, date(year, month, day))
+                except ValueError:
+                    body = None
+                if body is None:
+                    stub._count('not_found', api=True)
+                    self._reply(404)
+                    return
+
+                delay, failed = stub._draw()
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    stub._count('errors', api=True)
+                    self._reply(503)
+                    return
+                stub._count('ok', len(body), api=True)
+                self._reply(200, body, {'Content-Type': 'application/json'})
+
+            def _reply(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local amb les pàgines de meteo.cat gravades')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Directori amb pàgines .html')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Latència per resposta (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Variació de la latència (± ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Proporció de respostes 503 (0-1)')
+    parser.add_argument('--no-304', action='store_true', help='Ignorar les peticions condicionals')
+    parser.add_argument('--seed', type=int, default=None, help='Llavor per a latència i errors')
+    parser.add_argument('--api-key', default=None, help="Clau X-Api-Key exigida per l'API (per defecte cap)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.corpus)
+    if not pages:
+        print(f"❌ No hi ha pàgines a {args.corpus}")
+        print("   Executa primer: python benchmarks/bench_parsers.py --record")
+        return 1
+
+    server = StubServer(pages, args.host, args.port, args.latency, args.jitter, args.error_rate,
+                        not args.no_304, args.seed, api_key=args.api_key)
+    print(f"🛰️  {len(pages)} pàgines a {server.base_url}{STATION_PATH}?codi=XX (Ctrl+C per aturar)")
+    print(f"🛰️  API de {len(server.api_stations)} estacions a {server.base_url}{API_PATH}{{variable}}/{{any}}/{{mes}}/{{dia}}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    print(f"📊 {server.stats}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Feed de dades del banner (feed.json)
+
+JSON compacte i versionat amb els valors actuals de cada estació. El script de
+banner_news_channel.html el consulta periòdicament (petició condicional) i només
+modifica els blocs .content-group[data-station] que han canviat, de manera que
+l'HTML estàtic només cal regenerar-lo quan canvien la plantilla o les estacions.
+
+Format (v1):
+    {"v":1, "rev":"...", "layout":"...", "fields":[...],
+     "stations":{"XJ":["Girona", 12.3, 1.5, 0.2, "Actualitzat: 13:50 - Data: 18/10/2026"], ...}}
+
+    rev     - hash dels valors; no canvia si cap estació canvia (fitxer idèntic)
+    updated - el mateix text "Actualitzat" per a totes les estacions: l'hora de
+              l'última execució en què algun valor ha canviat
+    layout  - hash de la plantilla + estacions mostrades; si no coincideix amb el
+              de la pàgina, el client la recarrega
+"""
+
+import hashlib
+import json
+import os
+
+import config_banner as cfg
+import publish
+
+FEED_VERSION = 1
+FIELDS = ['name', 'TX', 'TN', 'PPT', 'updated']
+
+def _config():
+    return getattr(cfg, 'FEED_CONFIG', {})
+
+def enabled():
+    return _config().get('enabled', False)
+
+def feed_path():
+    return _config().get('file', os.path.join(cfg.BASE_DIR, 'feed.json'))
+
+def _hash(value):
+    encoded = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+def layout_signature(template, stations, fragment_version):
+    """Hash de la plantilla compilada, la versió dels blocs i les estacions (codi i nom) en ordre"""
+    return _hash([template.parts, template.slots, fragment_version,
+                  [[code, station_data['metadata']['name']] for code, station_data in stations]])
+
+def build_feed(data, template, context, fragment_version, previous=None):
+    """
+    Construeix el feed a partir de les dades de l'execució
+
+    Args:
+        previous: feed anterior; si la pàgina i els valors no han canviat es
+                  retorna tal qual (fitxer idèntic). Si algun ha canviat, totes
+                  les estacions passen a l'hora d'aquesta execució
+    """
+    stations = [(code, station_data) for code, station_data in data.get('stations', {}).items()
+                if station_data.get('success')]
+    layout = layout_signature(template, stations, fragment_version)
+
+    values_only = {}
+    for code, station_data in stations:
+        values = station_data.get('values', {})
+        values_only[code] = [station_data['metadata']['name'], values.get('TX'), values.get('TN'), values.get('PPT')]
+
+    # Només es compara la part de valors: si no ha canviat res, el feed anterior es manté
+    if previous and previous.get('v') == FEED_VERSION and previous.get('layout') == layout:
+        previous_stations = previous.get('stations', {})
+        if list(previous_stations) == list(values_only) and \
+                all(previous_stations[code][:4] == entry for code, entry in values_only.items()):
+            return previous
+
+    entries = {code: entry + [context.update_text] for code, entry in values_only.items()}
+    return {
+        'v': FEED_VERSION,
+        'rev': _hash(entries),
+        'layout': layout,
+        'fields': FIELDS,
+        'stations': entries
+    }
+
+def load_feed(path=None):
+    try:
+        with open(path or feed_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_feed(feed, path=None):
+    """
+    Escriu el feed (JSON compacte) i els seus germans .gz/.br, només si ha canviat
+
+    Returns:
+        publish.PublishResult
+    """
+    content = json.dumps(feed, ensure_ascii=False, separators=(',', ':'))
+    return publish.publish(path or feed_path(), content, minify=False)
+
+def html_needs_rebuild(previous, feed, html_file):
+    """
+    Indica si cal reescriure l'HTML estàtic
+
+    Només quan canvia el layout (plantilla o estacions), quan no hi ha HTML o
+    si FEED_CONFIG['html_only_on_layout_change'] està desactivat.
+    """
+    if not _config().get('html_only_on_layout_change', True):
+        return True
+    if not previous or previous.get('v') != FEED_VERSION or not os.path.exists(html_file):
+        return True
+    return previous.get('layout') != feed['layout']
@@ -0,0 +1,234 @@
+"""
+Orígens de dades del banner
+
+Tots els orígens retornen el mateix diccionari (format de latest_weather.json:
+'metadata' i 'stations' amb success/values/metadata per estació), de manera que
+save_data, store_run i els generadors del banner no saben d'on venen les dades.
+
+    WebScraperSource   - pàgines d'estació de www.meteo.cat (meteo_scraper.scrape_all)
+    MeteocatApiSource  - API oficial de la XEMA amb consultes massives: una petició
+                         per variable i dia retorna les lectures de totes les
+                         estacions, en lloc d'una pàgina per estació
+
+Ús:
+    data = data_sources.fetch_data()              # segons DATA_SOURCE_CONFIG
+    data = data_sources.get_source('api').fetch()
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+import config_banner as cfg
+import http_session
+import meteo_scraper
+from render_context import RenderContext
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ('auto', 'web', 'api')
+
+class DataSourceError(Exception):
+    """L'origen no ha pogut obtenir cap dada (clau invàlida, API caiguda...)"""
+
+def _config():
+    return getattr(cfg, 'DATA_SOURCE_CONFIG', {})
+
+class DataSource(ABC):
+    """Interfície comuna dels orígens de dades (un origen sense fetch no es pot instanciar)"""
+
+    name = None
+
+    @abstractmethod
+    def fetch(self, metrics=None):
+        """
+        Obté les dades de totes les estacions de cfg.STATIONS
+
+        Args:
+            metrics: instrumentation.RunMetrics on registrar temps (opcional)
+
+        Returns:
+            dict amb 'metadata' i 'stations' (format de latest_weather.json)
+        """
+
+class WebScraperSource(DataSource):
+    """Scraping de les pàgines d'estació (diari, caché HTTP, planificador i circuit breaker inclosos)"""
+
+    name = 'web'
+
+    def __init__(self, max_workers=None, requests_per_second=None, resume=True):
+        self.max_workers = max_workers
+        self.requests_per_second = requests_per_second
+        self.resume = resume
+
+    def fetch(self, metrics=None):
+        return meteo_scraper.scrape_all(self.max_workers, self.requests_per_second, self.resume, metrics)
+
+def _parse_time(text):
+    """'2026-10-18T10:30Z' -> datetime UTC (fromisoformat no accepta 'Z' a Python 3.9)"""
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    moment = datetime.fromisoformat(text)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+class MeteocatApiSource(DataSource):
+    """
+    API de la XEMA: /variables/mesurades/{variable}/{any}/{mes}/{dia}
+
+    Cada resposta és una llista d'estacions amb les lectures del dia UTC:
+        [{"codi": "D7", "variables": [{"codi": 32, "lectures": [
+            {"data": "2026-10-18T10:30Z", "valor": 18.4, "estat": "V"}, ...]}]}, ...]
+    El dia local (des de la mitjanit a Catalunya) comença el dia UTC anterior, així
+    que cada execució fa 2 peticions per variable, independentment del nombre
+    d'estacions. TX i TN són el màxim i el mínim de les lectures de temperatura
+    del dia local; PPT, la suma de la precipitació.
+    """
+
+    name = 'api'
+
+    # Lectures amb aquest estat no són vàlides
+    INVALID_STATES = ('N',)
+
+    def __init__(self, api_key=None, api_base=None, variables=None, session=None, context=None):
+        self.api_key = api_key or getattr(cfg, 'API_KEY', None)
+        if not self.api_key:
+            raise DataSourceError("Falta la clau de l'API (METEOCAT_API_KEY)")
+        self.api_base = (api_base or cfg.METEOcat_CONFIG.get('api_base', 'https://api.meteo.cat/xema/v1')).rstrip('/')
+        self.variables = variables or _config().get('api_variables', {'T': 32, 'PPT': 35})
+        self.session = session
+        self.context = context
+        self.stats = {'requests': 0, 'bytes': 0, 'readings': 0}
+
+    def url(self, variable, day):
+        return f"{self.api_base}/variables/mesurades/{variable}/{day.year}/{day.month:02d}/{day.day:02d}"
+
+    def _get(self, session, url):
+        """Una consulta massiva (els reintents de transport són a la sessió)"""
+        try:
+            response = session.get(url, timeout=http_session.get_timeout())
+        except requests.exceptions.RequestException as e:
+            raise DataSourceError(f"Error de xarxa consultant {url}: {e}") from e
+        self.stats['requests'] += 1
+        self.stats['bytes'] += len(response.content)
+        if response.status_code in (401, 403):
+            raise DataSourceError(f"L'API ha rebutjat la clau ({response.status_code})")
+        if response.status_code == 404:
+            # Dia sense dades publicades (p. ex. just després de mitjanit UTC)
+            return []
+        if response.status_code != 200:
+            raise DataSourceError(f"Resposta {response.status_code} de {url}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise DataSourceError(f"Resposta no JSON de {url}") from e
+
+    def readings(self, session, variable, start, end):
+        """Lectures vàlides de la variable entre start i end (UTC), per codi d'estació"""
+        by_station = {}
+        day = start.date()
+        while day <= end.date():
+            url = self.url(variable, day)
+            body = self._get(session, url)
+            # Un format inesperat (canvi de l'API, resposta truncada...) és una fallada de
+            # l'origen, no del programa: DataSourceError permet passar a scraping web
+            try:
+                if not isinstance(body, list):
+                    raise TypeError(f"s'esperava una llista i s'ha rebut {type(body).__name__}")
+                for station in body:
+                    for measured in station.get('variables', []):
+                        for reading in measured.get('lectures', []):
+                            value = reading.get('valor')
+                            if value is None or reading.get('estat') in self.INVALID_STATES:
+                                continue
+                            moment = _parse_time(reading['data'])
+                            if start <= moment <= end:
+                                by_station.setdefault(station['codi'], []).append((moment, float(value)))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                raise DataSourceError(f"Format de resposta inesperat a {url}: {e!r}") from e
+            day += timedelta(days=1)
+        return by_station
+
+    def fetch(self, metrics=None):
+        stations = cfg.STATIONS
+        context = self.context or RenderContext()
+        end = context.utc
+        start = context.local.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+
+        logger.info("=" * 60)
+        logger.info("🚀 API METEOCAT: %s estacions, dia local des de %s UTC", len(stations), start.strftime('%Y-%m-%d %H:%M'))
+        logger.info("=" * 60)
+
+        session = self.session or http_session.create_session(pool_size=1)
+        session.headers.update({'X-Api-Key': self.api_key, 'Accept': 'application/json'})
+        try:
+            with metrics.stage('scrape') if metrics else nullcontext():
+                temperature = self.readings(session, self.variables['T'], start, end)
+                precipitation = self.readings(session, self.variables['PPT'], start, end)
+        finally:
+            if self.session is None:
+                session.close()
+
+        all_data = {
+            'metadata': {
+                'last_updated': datetime.now(timezone.utc).isoformat(),
+                'source': 'meteocat_api',
+                'stations_count': len(stations),
+                'version': '2.0',
+                'api': self.stats
+            },
+            'stations': {}
+        }
+        for station in stations:
+            code = station['code']
+            temps = [value for _, value in temperature.get(code, [])]
+            rain = precipitation.get(code, [])
+            self.stats['readings'] += len(temps) + len(rain)
+            if not temps and not rain:
+                all_data['stations'][code] = meteo_scraper.failed_record(station, "Sense lectures a l'API")
+                continue
+            values = {
+                'TX': round(max(temps), 1) if temps else '-',
+                'TN': round(min(temps), 1) if temps else '-',
+                'PPT': round(sum(value for _, value in rain), 1) if rain else '-'
+            }
+            observed_at = max(moment for moment, _ in temperature.get(code, []) + rain).isoformat()
+            all_data['stations'][code] = meteo_scraper.build_station_record(
+                station['display_name'], meteo_scraper.station_url(code), values, observed_at)
+
+        success = sum(1 for record in all_data['stations'].values() if record['success'])
+        logger.info("✅ API: %s/%s estacions amb dades en %s peticions (%.1f KB)", success, len(stations),
+                    self.stats['requests'], self.stats['bytes'] / 1024)
+        return all_data
+
+def get_source(name=None, max_workers=None, requests_per_second=None, resume=True):
+    """
+    Origen de dades segons el nom o DATA_SOURCE_CONFIG['source']
+
+    'auto' retorna l'API si hi ha API_KEY i el scraper web si no n'hi ha.
+    """
+    name = name or _config().get('source', 'auto')
+    if name not in SOURCES:
+        raise ValueError(f"Origen de dades desconegut: {name} (opcions: {', '.join(SOURCES)})")
+    if name == 'api' or (name == 'auto' and getattr(cfg, 'API_KEY', None)):
+        return MeteocatApiSource()
+    return WebScraperSource(max_workers, requests_per_second, resume)
+
+def fetch_data(name=None, metrics=None, max_workers=None, requests_per_second=None, resume=True):
+    """
+    Obté les dades amb l'origen configurat; en mode 'auto', si l'API falla es fa scraping
+
+    Returns:
+        dict amb 'metadata' i 'stations' (format de latest_weather.json)
+    """
+    name = name or _config().get('source', 'auto')
+    source = get_source(name, max_workers, requests_per_second, resume)
+    try:
+        return source.fetch(metrics)
+    except DataSourceError as e:
+        if name != 'auto':
+            raise
+        logger.warning("⚠️  API no disponible (%s): passant a scraping web", e)
+        return WebScraperSource(max_workers, requests_per_second, resume).fetch(metrics)
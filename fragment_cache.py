@@ -0,0 +1,102 @@
+"""
+Caché de blocs HTML per estació
+
+Cada bloc es guarda amb una clau = hash dels camps que es mostren (nom i
+TX/TN/PPT), no de tota la metadata (last_fetched canvia a cada execució).
+Si la clau no ha canviat es reutilitza el bloc. El bloc es guarda partit al
+text "Actualitzat", que no forma part de la caché: totes les estacions
+mostren l'hora de l'execució (RenderContext).
+
+També es guarda la signatura dels valors de l'últim HTML publicat: si cap
+estació canvia, no cal reescriure l'HTML només per l'hora.
+"""
+
+import hashlib
+import json
+import os
+
+import atomic_io
+import config_banner as cfg
+
+class FragmentCache:
+    """Blocs HTML renderitzats per codi d'estació, persistits en JSON"""
+
+    def __init__(self, path=None, version=1, enabled=None):
+        config = getattr(cfg, 'FRAGMENT_CACHE_CONFIG', {})
+        self.path = path or config.get('file', os.path.join(cfg.DATA_DIR, 'fragment_cache.json'))
+        self.enabled = enabled if enabled is not None else config.get('enabled', True)
+        self.version = version
+        self.fragments = {}
+        self.signature = None
+        self.published = None
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    @staticmethod
+    def key(station_data):
+        """Hash dels camps visibles d'una estació"""
+        visible = {
+            'name': station_data.get('metadata', {}).get('name'),
+            'values': station_data.get('values', {})
+        }
+        encoded = json.dumps(visible, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()[:16]
+
+    def load(self):
+        if not self.enabled:
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == self.version:
+                self.fragments = cached.get('fragments', {})
+                self.published = cached.get('published')
+        except (OSError, ValueError):
+            self.fragments = {}
+        return self
+
+    @staticmethod
+    def render_signature(visible):
+        """Hash del que es mostra en un render, sense l'hora (plantilla, claus dels blocs...)"""
+        encoded = json.dumps(visible, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()[:16]
+
+    def unchanged(self):
+        """El render actual mostra els mateixos valors que l'últim HTML publicat"""
+        return self.signature is not None and self.signature == self.published
+
+    def mark_published(self):
+        if self.signature != self.published:
+            self.published = self.signature
+            self._dirty = True
+
+    def get(self, station_code, key):
+        entry = self.fragments.get(station_code)
+        if entry and entry.get('key') == key:
+            self.hits += 1
+            return entry['html']
+        self.misses += 1
+        return None
+
+    def put(self, station_code, key, html):
+        self.fragments[station_code] = {'key': key, 'html': html}
+        self._dirty = True
+
+    def retain(self, station_codes):
+        """Elimina els blocs d'estacions que ja no es mostren"""
+        station_codes = set(station_codes)
+        for station_code in list(self.fragments):
+            if station_code not in station_codes:
+                del self.fragments[station_code]
+                self._dirty = True
+
+    def save(self):
+        if not self.enabled or not self._dirty:
+            return
+        try:
+            atomic_io.write_json(self.path, {'version': self.version, 'fragments': self.fragments,
+                                             'published': self.published}, fsync=False)
+            self._dirty = False
+        except OSError:
+            pass  # La caché és opcional
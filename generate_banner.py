@@ -5,63 +5,54 @@ AMB HORA LOCAL I DATA dd/mm/yyyy
 """
 
 import json
-from datetime import datetime, timezone, timedelta
 import os
 
+import banner_template
+import data_feed
+import publish
+from fragment_cache import FragmentCache
+from render_context import RenderContext
+
+# Incrementar quan canviï el marcatge de generate_station_html (invalida la caché de blocs)
+FRAGMENT_VERSION = 3
+
+# Lloc del text "Actualitzat" dins del bloc d'una estació: els blocs es guarden a
+# la caché partits per aquí i l'hora de l'execució s'hi posa a cada render
+UPDATE_MARKER = '<!--UPDATE-->'
+
 def load_template(template_file="banner_news_channel.html"):
-    """Carrega el template HTML"""
+    """Carrega el template HTML ja compilat (veure banner_template.py)"""
     try:
-        with open(template_file, 'r', encoding='utf-8') as f:
-            return f.read()
+        return banner_template.load_template(template_file)
     except Exception as e:
         print(f"❌ Error carregant template: {e}")
         return None
 
-def get_local_time():
-    """Retorna l'hora i data local de Catalunya (CET/CEST) segons l'horari d'estiu"""
-    utc_now = datetime.now(timezone.utc)
-    
-    # Determinar si estem en horari d'estiu (CEST) o d'hivern (CET)
-    # L'horari d'estiu a Europa: últim diumenge de març a 01:00 UTC fins últim diumenge d'octubre a 01:00 UTC
-    year = utc_now.year
-    
-    # Calcular últim diumenge de març
-    last_sunday_march = None
-    for day in range(31, 24, -1):
-        dt = datetime(year, 3, day, 1, 0, 0, tzinfo=timezone.utc)
-        if dt.weekday() == 6:  # Diumenge
-            last_sunday_march = dt
-            break
-    
-    # Calcular últim diumenge d'octubre
-    last_sunday_october = None
-    for day in range(31, 24, -1):
-        dt = datetime(year, 10, day, 1, 0, 0, tzinfo=timezone.utc)
-        if dt.weekday() == 6:  # Diumenge
-            last_sunday_october = dt
-            break
-    
-    # Determinar si estem en horari d'estiu
-    if last_sunday_march and last_sunday_october:
-        if last_sunday_march <= utc_now < last_sunday_october:
-            offset_hours = 2  # CEST (UTC+2)
-        else:
-            offset_hours = 1  # CET (UTC+1)
-    else:
-        offset_hours = 1  # Per defecte CET
+def generate_station_html(station_data, context=None, station_code=""):
+    """
+    Genera el HTML per una estació individual
     
-    local_time = utc_now + timedelta(hours=offset_hours)
-    hora_local = local_time.strftime("%H:%M")
-    data_local = local_time.strftime("%d/%m/%Y")
+    Args:
+        context: RenderContext de l'execució (hora local comuna a totes les estacions)
+        station_code: Codi de l'estació (atribut data-station, per actualitzar-la des de feed.json)
+    """
+    parts = generate_station_parts(station_data, station_code)
+    if parts is None:
+        return ""
     
-    return hora_local, data_local
+    # HORA LOCAL (Catalunya, amb horari d'estiu automàtic) i DATA dd/mm/yyyy
+    context = context or RenderContext()
+    return parts[0] + context.update_text + parts[1]
 
-def generate_station_html(station_data):
+def generate_station_parts(station_data, station_code=""):
     """
-    Genera el HTML per una estació individual
+    Bloc HTML d'una estació partit al text "Actualitzat" (el que es guarda a la caché)
+    
+    Returns:
+        [abans, després] o None si l'estació no té dades
     """
     if not station_data.get('success'):
-        return ""
+        return None
     
     metadata = station_data['metadata']
     values = station_data['values']
@@ -76,11 +67,8 @@ def generate_station_html(station_data):
     tn_display = f"{tn}" if tn != '-' else "-"
     ppt_display = f"{ppt}" if ppt != '-' else "-"
     
-    # HORA LOCAL (Catalunya, amb horari d'estiu automàtic) i DATA dd/mm/yyyy
-    hora_local, data_local = get_local_time()
-    
-    return f"""
-            <div class="content-group">
+    html = f"""
+            <div class="content-group" data-station="{station_code}">
                 <div class="location-header">
                     <div class="location-name">{station_name}</div>
                 </div>
@@ -100,54 +88,75 @@ def generate_station_html(station_data):
                 </div>
                 <!-- CANVIS AQUÍ: Hora local i data dd/mm/yyyy -->
                 <div class="footer">
-                    <div class="update-info">Actualitzat: {hora_local} - Data: {data_local}</div>
+                    <div class="update-info">{UPDATE_MARKER}</div>
                     <div class="source">Font: https://www.meteo.cat/</div>
                 </div>
             </div>
     """
+    return html.split(UPDATE_MARKER, 1)
 
-def main():
-    """Funció principal"""
-    print("🎨 Generant banner meteorològic...")
-    
-    # 1. Carregar template
-    template = load_template()
-    if not template:
-        return
-    
-    # 2. Carregar dades meteorològiques
-    data_file = "data/latest_weather.json"
+def load_data(data_file="data/latest_weather.json"):
+    """Carrega les dades meteorològiques generades per meteo_scraper.py"""
     if not os.path.exists(data_file):
         print(f"❌ El fitxer {data_file} no existeix")
         print("   Executa primer meteo_scraper.py per obtenir dades")
-        return
+        return None
     
     try:
         with open(data_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            return json.load(f)
     except Exception as e:
         print(f"❌ Error llegint dades: {e}")
-        return
+        return None
+
+def render_banner(data, template, fragment_cache=None, context=None, feed=None):
+    """
+    Genera l'HTML complet del banner a partir de les dades (en memòria)
     
+    Args:
+        fragment_cache: FragmentCache opcional; només es tornen a generar
+                        les estacions amb valors nous (l'hora "Actualitzat" és
+                        la de l'execució per a totes). Hi queda la signatura dels
+                        valors mostrats, per a write_banner
+        context: RenderContext compartit per tots els blocs (per defecte, l'hora actual)
+        feed: Feed de dades de l'execució (el seu layout s'inclou a la pàgina)
+    
+    Returns:
+        (html, nombre d'estacions mostrades)
+    """
     stations = data.get('stations', {})
+    context = context or RenderContext()
     
-    # 3. Generar HTML per a cada estació
-    stations_html = ""
+    # 3. Generar HTML per a cada estació (o reutilitzar el bloc si no ha canviat),
+    # amb el mateix "Actualitzat" per a totes
+    fragments = []
+    keys = []
     station_count = 0
     
     for station_id, station_data in stations.items():
         if station_data.get('success'):
-            station_html = generate_station_html(station_data)
-            if station_html:
-                stations_html += station_html
+            if fragment_cache is None:
+                parts = generate_station_parts(station_data, station_id)
+            else:
+                key = fragment_cache.key(station_data)
+                parts = fragment_cache.get(station_id, key)
+                if parts is None:
+                    parts = generate_station_parts(station_data, station_id)
+                    fragment_cache.put(station_id, key, parts)
+                keys.append([station_id, key])
+            if parts:
+                fragments.extend((parts[0], context.update_text, parts[1]))
                 station_count += 1
     
+    if fragment_cache is not None:
+        fragment_cache.retain(code for code, station_data in stations.items() if station_data.get('success'))
+        fragment_cache.signature = fragment_cache.render_signature(
+            [template.parts, template.slots, feed['layout'] if feed else '', keys])
+    
     # 4. Si no hi ha dades, mostrar missatge (AMB HORA LOCAL)
     if station_count == 0:
         # Hora local també per a sense dades
-        hora_local, data_local = get_local_time()
-        
-        stations_html = f"""
+        fragments = [f"""
             <div class="content-group active">
                 <div class="location-header">
                     <div class="location-name">SENSE DADES</div>
@@ -168,41 +177,104 @@ def main():
                 </div>
                 <!-- CANVIS AQUÍ també -->
                 <div class="footer">
-                    <div class="update-info">Actualitzat: {hora_local} - Data: {data_local}</div>
+                    <div class="update-info">{context.update_text}</div>
                     <div class="source">Font: https://www.meteo.cat/</div>
                 </div>
             </div>
-        """
-    
-    # 5. Injectar stations_html al template
-    # Buscar el div.scroll-container i reemplaçar el seu contingut
-    start_marker = '<div class="scroll-container">'
-    end_marker = '</div>\n    </div>'  # Tancament de .scroll-container + .weather-container
-    
-    start_idx = template.find(start_marker)
-    end_idx = template.find(end_marker, start_idx)
-    
-    if start_idx != -1 and end_idx != -1:
-        # Mantenir el div.scroll-container obert i tancat
-        new_content = f'{start_marker}\n            {stations_html}\n        </div>'
-        updated_template = template[:start_idx] + new_content + template[end_idx:]
-    else:
-        # Fallback: reemplaçar manualment
-        placeholder = '<!-- EL CONTINGUT D\'AQUÍ ES REEMPLAÇARÀ COMPLETAMENT PER update_banner.py -->'
-        updated_template = template.replace(placeholder, stations_html)
-    
-    # 6. Guardar fitxer
-    output_file = "banner_output.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(updated_template)
-    
-    print(f"✅ Banner generat amb {station_count} estacions")
-    print(f"🏁 Fitxer: {output_file}")
-    
-    # 7. També generar index.html (per GitHub Pages)
-    with open("index.html", 'w', encoding='utf-8') as f:
-        f.write(updated_template)
-    print("📄 index.html actualitzat")
+        """]
+    
+    # 5. Omplir el slot de les estacions (contingut del div.scroll-container)
+    html = template.render(stations=['\n            ', *fragments, '\n        '],
+                           feed_layout=feed['layout'] if feed else '')
+    
+    return html, station_count
+
+def prepare_feed(data, template, context):
+    """
+    Construeix el feed de dades (si FEED_CONFIG està activat)
+    
+    Returns:
+        (feed, feed anterior) o (None, None)
+    """
+    if not data_feed.enabled():
+        return None, None
+    previous_feed = data_feed.load_feed()
+    return data_feed.build_feed(data, template, context, FRAGMENT_VERSION, previous_feed), previous_feed
+
+def write_banner(html, output_file="banner_output.html", index_file="index.html", feed=None, previous_feed=None,
+                 fragment_cache=None):
+    """
+    Escriu el banner i la còpia per a GitHub Pages, només si han canviat
+    
+    Amb feed, els valors es publiquen a feed.json i l'HTML només es reescriu
+    quan canvien la plantilla o les estacions mostrades. Amb fragment_cache,
+    l'HTML no es reescriu si els valors mostrats són els de l'última publicació
+    (només canviaria l'hora "Actualitzat").
+    
+    Returns:
+        True si s'ha escrit algun fitxer
+    """
+    if feed is not None:
+        result = data_feed.write_feed(feed)
+        print(f"📡 feed.json actualitzat (rev {feed['rev']})" if result.written else "⏭️  feed.json sense canvis")
+        print(f"   📦 {publish.format_sizes(result)}")
+        if not data_feed.html_needs_rebuild(previous_feed, feed, index_file or output_file):
+            print("⏭️  Plantilla i estacions sense canvis: l'HTML no es reescriu")
+            return result.written
+    
+    if fragment_cache is not None and fragment_cache.unchanged() \
+            and all(os.path.exists(path) for path in (output_file, index_file) if path):
+        print("⏭️  Valors sense canvis: l'HTML no es reescriu")
+        return False
+    
+    # 6. Guardar fitxer (minificat, amb .gz/.br)
+    result = publish.publish(output_file, html)
+    written = result.written
+    if fragment_cache is not None:
+        fragment_cache.mark_published()
+    print(f"🏁 Fitxer: {output_file}" if written else f"⏭️  {output_file} sense canvis")
+    print(f"   📦 {publish.format_sizes(result)}")
+    
+    # 7. index.html (per GitHub Pages): hardlink de banner_output.html, sense tornar-lo a escriure
+    if index_file:
+        if publish.publish_copy(output_file, index_file):
+            print("📄 index.html actualitzat")
+            written = True
+        else:
+            print("⏭️  index.html sense canvis")
+    return written
+
+def main(data=None):
+    """
+    Funció principal
+    
+    Args:
+        data: Dades ja carregades (p. ex. des de pipeline.py). Si és None es llegeix
+              data/latest_weather.json
+    """
+    print("🎨 Generant banner meteorològic...")
+    
+    # 1. Carregar template
+    template = load_template()
+    if not template:
+        return False
+    
+    # 2. Carregar dades meteorològiques
+    if data is None:
+        data = load_data()
+        if data is None:
+            return False
+    
+    context = RenderContext()
+    fragment_cache = FragmentCache(version=FRAGMENT_VERSION).load()
+    feed, previous_feed = prepare_feed(data, template, context)
+    html, station_count = render_banner(data, template, fragment_cache, context, feed)
+    print(f"✅ Banner generat amb {station_count} estacions "
+          f"({fragment_cache.misses} regenerades, {fragment_cache.hits} de la caché)")
+    
+    write_banner(html, feed=feed, previous_feed=previous_feed, fragment_cache=fragment_cache)
+    fragment_cache.save()
+    return True
 
 if __name__ == "__main__":
     main()
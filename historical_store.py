@@ -0,0 +1,204 @@
+"""
+Històric d'observacions per estació (TX/TN/PPT) en format binari d'amplada fixa
+
+Per cada estació hi ha dos fitxers a HISTORICAL_DIR:
+    XJ.bin  - capçalera de 16 bytes + registres de 20 bytes (<qfff):
+              fetched_at (segons UTC), TX, TN, PPT (float32, NaN = sense dada)
+    XJ.idx  - índex dispers de 12 bytes per dia (<iq): dia (des de 1970) i
+              número del primer registre d'aquell dia
+
+Afegir una execució és O(estacions): un registre al final de cada .bin i, només
+quan canvia el dia, una entrada al final de l'.idx. Les lectures per rang
+fan servir mmap i cerca binària, sense carregar tot l'històric.
+"""
+
+import math
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import config_banner as cfg
+
+MAGIC = b'MTHS'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+RECORD = struct.Struct('<qfff')
+INDEX_ENTRY = struct.Struct('<iq')
+SECONDS_PER_DAY = 86400
+
+Observation = namedtuple('Observation', ['fetched_at', 'TX', 'TN', 'PPT'])
+
+def _paths(station_code, directory=None):
+    directory = directory or cfg.HISTORICAL_DIR
+    base = os.path.join(directory, station_code)
+    return f"{base}.bin", f"{base}.idx"
+
+def _to_epoch(value):
+    """Accepta datetime, ISO 8601 o segons i retorna segons UTC (int)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def _from_float(value):
+    return None if math.isnan(value) else round(value, 1)
+
+def record_count(station_code, directory=None):
+    """Nombre de registres guardats per una estació"""
+    bin_path, _ = _paths(station_code, directory)
+    try:
+        size = os.path.getsize(bin_path)
+    except OSError:
+        return 0
+    return max(0, (size - HEADER.size) // RECORD.size)
+
+def append_observation(station_code, fetched_at, tx, tn, ppt, directory=None):
+    """
+    Afegeix una observació al final de l'històric d'una estació
+
+    Les observacions han d'arribar en ordre; si fetched_at no és posterior a
+    l'últim registre (p. ex. la mateixa execució dues vegades) no s'afegeix.
+
+    Returns:
+        True si s'ha afegit el registre
+    """
+    bin_path, idx_path = _paths(station_code, directory)
+    os.makedirs(os.path.dirname(bin_path), exist_ok=True)
+    fetched_at = _to_epoch(fetched_at)
+
+    with open(bin_path, 'ab+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size < HEADER.size:
+            f.truncate(0)
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            size = HEADER.size
+            last_day = None
+        else:
+            count = (size - HEADER.size) // RECORD.size
+            size = HEADER.size + count * RECORD.size
+            f.truncate(size)  # Descarta un registre a mitges d'una execució interrompuda
+            last_day = None
+            if count:
+                f.seek(size - RECORD.size)
+                last_at = RECORD.unpack(f.read(RECORD.size))[0]
+                if fetched_at <= last_at:
+                    return False
+                last_day = last_at // SECONDS_PER_DAY
+
+        record_number = (size - HEADER.size) // RECORD.size
+        f.seek(0, os.SEEK_END)
+        f.write(RECORD.pack(fetched_at, _to_float(tx), _to_float(tn), _to_float(ppt)))
+
+    day = fetched_at // SECONDS_PER_DAY
+    if day != last_day:
+        with open(idx_path, 'ab') as f:
+            f.write(INDEX_ENTRY.pack(day, record_number))
+    return True
+
+def append_run(all_data, directory=None):
+    """
+    Afegeix a l'històric totes les estacions amb èxit d'una execució del scraper
+
+    Returns:
+        Nombre d'observacions afegides
+    """
+    appended = 0
+    for station_code, station_data in all_data.get('stations', {}).items():
+        if not station_data.get('success'):
+            continue
+        values = station_data.get('values', {})
+        fetched_at = station_data.get('metadata', {}).get('last_fetched')
+        if not fetched_at:
+            continue
+        if append_observation(station_code, fetched_at, values.get('TX'), values.get('TN'),
+                              values.get('PPT'), directory):
+            appended += 1
+    return appended
+
+def _load_index(idx_path):
+    try:
+        with open(idx_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return [], []
+    days, starts = [], []
+    for day, start in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+        days.append(day)
+        starts.append(start)
+    return days, starts
+
+class _Timestamps:
+    """Vista indexable dels timestamps d'un mmap (per a bisect)"""
+
+    def __init__(self, buffer, count):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<q', self.buffer, HEADER.size + i * RECORD.size)[0]
+
+def read_range(station_code, start=None, end=None, directory=None):
+    """
+    Llegeix les observacions d'una estació entre start i end (inclosos)
+
+    Args:
+        start, end: datetime, ISO 8601 o segons UTC (None = sense límit)
+
+    Returns:
+        Llista d'Observation ordenada per fetched_at
+    """
+    bin_path, idx_path = _paths(station_code, directory)
+    count = record_count(station_code, directory)
+    if not count:
+        return []
+
+    start, end = _to_epoch(start), _to_epoch(end)
+    days, starts = _load_index(idx_path)
+
+    # L'índex redueix la cerca als dies del rang
+    lo, hi = 0, count
+    if days and start is not None:
+        pos = bisect_right(days, start // SECONDS_PER_DAY) - 1
+        if pos >= 0:
+            lo = starts[pos]
+    if days and end is not None:
+        pos = bisect_right(days, end // SECONDS_PER_DAY)
+        if pos < len(days):
+            hi = starts[pos]
+
+    with open(bin_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            timestamps = _Timestamps(buffer, count)
+            if start is not None:
+                lo = bisect_left(timestamps, start, lo, hi)
+            if end is not None:
+                hi = bisect_right(timestamps, end, lo, hi)
+
+            observations = []
+            for i in range(lo, hi):
+                fetched_at, tx, tn, ppt = RECORD.unpack_from(buffer, HEADER.size + i * RECORD.size)
+                observations.append(Observation(fetched_at, _from_float(tx), _from_float(tn), _from_float(ppt)))
+            return observations
+
+def read_last(station_code, hours=None, days=None, directory=None, now=None):
+    """Observacions de les últimes N hores o N dies d'una estació"""
+    now = _to_epoch(now) if now is not None else int(datetime.now(timezone.utc).timestamp())
+    span = (hours or 0) * 3600 + (days or 0) * SECONDS_PER_DAY
+    return read_range(station_code, start=now - span, end=now, directory=directory)
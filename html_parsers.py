@@ -0,0 +1,327 @@
+"""
+Backends d'anàlisi HTML per a les pàgines d'estació de MeteoCat
+
+Tots els backends retornen el mateix resultat (PageExtract): les files de la
+taula de dades trobada (text de cada cel·la) o, si no n'hi ha, el text de la
+pàgina per a l'extracció per regex. BeautifulSoup queda com a fallback.
+
+Backends disponibles:
+    'stream'     - Tokenitzador de la llibreria estàndard; s'atura en tancar la taula
+    'lxml'       - Analitzador incremental de lxml (opcional, pip install lxml); també
+                   s'atura en tancar la taula del primer patró
+    'selectolax' - selectolax (opcional, pip install selectolax)
+    'bs4'        - BeautifulSoup amb html.parser (comportament original)
+    'auto'       - El primer disponible de lxml, selectolax, stream
+"""
+
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+# Patrons de taula, per ordre de preferència
+TABLE_PATTERNS = [
+    {'class': 'table-dades'},
+    {'class': 'taula-dades'},
+    {'class': 'dades-table'},
+    {'id': 'taula-dades'},
+    {'id': 'table-dades'},
+    {'class': 'table'},
+    {'class': 'taula'}
+]
+
+class PageExtract:
+    """Resultat de l'anàlisi d'una pàgina"""
+
+    __slots__ = ('rows', 'pattern', 'text', 'backend')
+
+    def __init__(self, rows=None, pattern=None, text='', backend=None):
+        self.rows = rows          # [[text_cel·la, ...], ...] o None si no hi ha taula
+        self.pattern = pattern    # Patró de TABLE_PATTERNS que ha trobat la taula
+        self.text = text          # Text de la pàgina (només si no hi ha taula)
+        self.backend = backend
+
+    @property
+    def has_table(self):
+        return self.rows is not None
+
+def decode_content(content):
+    """Converteix el cos de la resposta a text (meteo.cat serveix UTF-8)"""
+    if isinstance(content, str):
+        return content
+    return content.decode('utf-8', errors='replace')
+
+def _pattern_matches(pattern, attrs):
+    """Replica el criteri de soup.find('table', pattern) sobre una llista d'atributs"""
+    for attr, expected in pattern.items():
+        value = attrs.get(attr)
+        if value is None:
+            return False
+        if attr == 'class':
+            if expected != value and expected not in value.split():
+                return False
+        elif value != expected:
+            return False
+    return True
+
+def _match_index(patterns, attrs):
+    for idx, pattern in enumerate(patterns):
+        if _pattern_matches(pattern, attrs):
+            return idx
+    return None
+
+# ============================================================================
+# BACKEND 'stream' (llibreria estàndard)
+# ============================================================================
+class _StopParsing(Exception):
+    pass
+
+class _TableCapture:
+    """Files i cel·les d'una taula candidata mentre s'està llegint"""
+
+    def __init__(self, pattern_idx, depth):
+        self.pattern_idx = pattern_idx
+        self.depth = depth
+        self.rows = []
+        self.open_rows = []
+        self.open_cells = []
+
+class _StreamingTableParser(HTMLParser):
+    """
+    Tokenitzador que captura les taules que coincideixen amb algun patró i
+    s'atura tan bon punt es tanca una taula del patró preferit
+    """
+
+    SKIP_TEXT_TAGS = ('script', 'style')
+
+    def __init__(self, patterns):
+        super().__init__(convert_charrefs=True)
+        self.patterns = patterns
+        self.table_depth = 0
+        self.captures = []
+        self.best = None
+        self.text_parts = []
+        self.skip_text = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TEXT_TAGS:
+            self.skip_text += 1
+            return
+
+        if tag == 'table':
+            self.table_depth += 1
+            idx = _match_index(self.patterns, dict((k, v or '') for k, v in attrs))
+            if idx is not None and (self.best is None or idx < self.best.pattern_idx) \
+                    and all(idx < c.pattern_idx for c in self.captures):
+                self.captures.append(_TableCapture(idx, self.table_depth))
+            return
+
+        if not self.captures:
+            return
+
+        if tag == 'tr':
+            for capture in self.captures:
+                self._close_cells(capture)
+                capture.open_rows = [row for row in capture.open_rows if row[0] != self.table_depth]
+                row = (self.table_depth, [])
+                capture.open_rows.append(row)
+                capture.rows.append(row[1])
+        elif tag in ('td', 'th'):
+            for capture in self.captures:
+                self._close_cells(capture)
+                cell = (self.table_depth, [])
+                capture.open_cells.append(cell)
+                for _, cells in capture.open_rows:
+                    cells.append(cell[1])
+
+    def _close_cells(self, capture):
+        capture.open_cells = [cell for cell in capture.open_cells if cell[0] != self.table_depth]
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TEXT_TAGS:
+            self.skip_text = max(0, self.skip_text - 1)
+            return
+
+        if tag == 'table':
+            finished = [c for c in self.captures if c.depth == self.table_depth]
+            self.captures = [c for c in self.captures if c.depth != self.table_depth]
+            for capture in finished:
+                if self.best is None or capture.pattern_idx < self.best.pattern_idx:
+                    self.best = capture
+            self.table_depth = max(0, self.table_depth - 1)
+            if self.best is not None and self.best.pattern_idx == 0:
+                raise _StopParsing()
+            return
+
+        if not self.captures:
+            return
+
+        if tag == 'tr':
+            for capture in self.captures:
+                self._close_cells(capture)
+                capture.open_rows = [row for row in capture.open_rows if row[0] != self.table_depth]
+        elif tag in ('td', 'th'):
+            for capture in self.captures:
+                self._close_cells(capture)
+
+    def handle_data(self, data):
+        if self.skip_text:
+            return
+        if self.best is None:
+            self.text_parts.append(data)
+        if self.captures:
+            stripped = data.strip()
+            if stripped:
+                for capture in self.captures:
+                    for _, parts in capture.open_cells:
+                        parts.append(stripped)
+
+def parse_stream(content, patterns=TABLE_PATTERNS):
+    parser = _StreamingTableParser(patterns)
+    try:
+        parser.feed(decode_content(content))
+        parser.close()
+    except _StopParsing:
+        pass
+
+    best = parser.best
+    if best is None:
+        return PageExtract(text=''.join(parser.text_parts), backend='stream')
+    rows = [[''.join(parts) for parts in row] for row in best.rows]
+    return PageExtract(rows=rows, pattern=patterns[best.pattern_idx], backend='stream')
+
+# ============================================================================
+# BACKEND 'lxml'
+# ============================================================================
+# Mida dels blocs que s'envien a l'analitzador incremental
+LXML_CHUNK_SIZE = 16384
+
+def parse_lxml(content, patterns=TABLE_PATTERNS):
+    if lxml is None:
+        raise ImportError("lxml no està instal·lat")
+
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    parser = lxml.etree.HTMLPullParser(events=('end',), tag='table', encoding='utf-8')
+    best, best_idx = None, None
+    root = None
+    for offset in range(0, len(content), LXML_CHUNK_SIZE):
+        parser.feed(content[offset:offset + LXML_CHUNK_SIZE])
+        for _, table in parser.read_events():
+            idx = _match_index(patterns, dict(table.attrib))
+            if idx is not None and (best_idx is None or idx < best_idx):
+                best, best_idx = table, idx
+        # Taula del patró preferit tancada: la resta de la pàgina no cal
+        if best_idx == 0:
+            break
+    else:
+        root = parser.close()
+
+    if best is not None:
+        rows = [
+            [''.join(t.strip() for t in cell.itertext()) for cell in row.iter('td', 'th')]
+            for row in best.iter('tr')
+        ]
+        return PageExtract(rows=rows, pattern=patterns[best_idx], backend='lxml')
+
+    if root is None:
+        return PageExtract(text='', backend='lxml')
+    text = ''.join(root.xpath('//text()[not(ancestor::script) and not(ancestor::style)]'))
+    return PageExtract(text=text, backend='lxml')
+
+# ============================================================================
+# BACKEND 'selectolax'
+# ============================================================================
+def _css_selector(pattern):
+    selector = 'table'
+    for attr, expected in pattern.items():
+        selector += f".{expected}" if attr == 'class' else f"[{attr}=\"{expected}\"]"
+    return selector
+
+def parse_selectolax(content, patterns=TABLE_PATTERNS):
+    if SelectolaxParser is None:
+        raise ImportError("selectolax no està instal·lat")
+
+    tree = SelectolaxParser(content)
+    for pattern in patterns:
+        table = tree.css_first(_css_selector(pattern))
+        if table is not None:
+            rows = [
+                [cell.text(deep=True, separator='', strip=True) for cell in row.css('td, th')]
+                for row in table.css('tr')
+            ]
+            return PageExtract(rows=rows, pattern=pattern, backend='selectolax')
+
+    for node in tree.css('script, style'):
+        node.decompose()
+    text = tree.body.text(deep=True, separator='') if tree.body is not None else ''
+    return PageExtract(text=text, backend='selectolax')
+
+# ============================================================================
+# BACKEND 'bs4' (fallback)
+# ============================================================================
+def parse_bs4(content, patterns=TABLE_PATTERNS):
+    soup = BeautifulSoup(content, 'html.parser')
+
+    for pattern in patterns:
+        table = soup.find('table', pattern)
+        if table:
+            rows = [
+                [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+                for row in table.find_all('tr')
+            ]
+            return PageExtract(rows=rows, pattern=pattern, backend='bs4')
+
+    return PageExtract(text=soup.get_text(), backend='bs4')
+
+BACKENDS = {
+    'stream': parse_stream,
+    'lxml': parse_lxml,
+    'selectolax': parse_selectolax,
+    'bs4': parse_bs4
+}
+
+def available_backends():
+    """Backends que es poden fer servir en aquest entorn"""
+    available = ['stream', 'bs4']
+    if lxml is not None:
+        available.insert(0, 'lxml')
+    if SelectolaxParser is not None:
+        available.insert(1 if lxml is not None else 0, 'selectolax')
+    return available
+
+def resolve_backend(backend='auto'):
+    """Converteix 'auto' (o un backend no disponible) en un backend concret"""
+    available = available_backends()
+    if backend in available:
+        return backend
+    return available[0]
+
+def parse_page(content, backend='auto', patterns=TABLE_PATTERNS):
+    """
+    Analitza una pàgina d'estació amb el backend indicat
+
+    Si el backend ràpid no troba cap taula es retorna el seu text (per a
+    l'extracció per regex); només es torna a analitzar amb BeautifulSoup, el
+    comportament de referència, si el backend ràpid falla.
+    """
+    backend = resolve_backend(backend)
+    if backend != 'bs4':
+        try:
+            return BACKENDS[backend](content, patterns)
+        except Exception:
+            pass
+    return parse_bs4(content, patterns)
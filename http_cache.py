@@ -0,0 +1,139 @@
+"""
+Caché HTTP persistent per a les pàgines de les estacions
+Guarda ETag/Last-Modified i un hash del cos per fer peticions condicionals
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import atomic_io
+import config_banner as cfg
+
+def hash_body(content):
+    """Hash del cos de la resposta (bytes)"""
+    return hashlib.sha256(content).hexdigest()
+
+def hash_values(values):
+    """Hash estable dels valors extrets d'una estació"""
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode('utf-8')).hexdigest()
+
+class HttpCache:
+    """
+    Caché en disc, una entrada JSON per URL
+
+    Les entrades no guarden cap ruta absoluta, de manera que el directori es pot
+    desar i restaurar entre execucions (p. ex. amb actions/cache a GitHub Actions).
+    """
+
+    def __init__(self, cache_dir=None, max_age_hours=None, max_size_mb=None):
+        config = getattr(cfg, 'HTTP_CACHE_CONFIG', {})
+        self.cache_dir = cache_dir or config.get('dir', os.path.join(cfg.DATA_DIR, 'http_cache'))
+        self.max_age = (max_age_hours if max_age_hours is not None else config.get('max_age_hours', 48)) * 3600
+        self.max_size = (max_size_mb if max_size_mb is not None else config.get('max_size_mb', 5)) * 1024 * 1024
+        self.stats = {'not_modified': 0, 'unchanged_body': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url):
+        """Retorna l'entrada guardada per la URL o None si no n'hi ha (o ha caducat)"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('stored_at', 0) > self.max_age:
+            return None
+        return entry
+
+    def is_valid_for(self, entry, values):
+        """Comprova que l'entrada correspon als valors que es volen reutilitzar"""
+        return bool(entry) and entry.get('values_hash') == hash_values(values)
+
+    def conditional_headers(self, entry):
+        """Capçaleres If-None-Match / If-Modified-Since per a una entrada"""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response, body_hash, values):
+        """Guarda els validadors d'una resposta 200 i el hash dels valors extrets"""
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'values_hash': hash_values(values),
+            'stored_at': time.time()
+        }
+        self._write(url, entry)
+
+    def touch(self, url, entry):
+        """Renova la data d'una entrada que el servidor ha confirmat (304 o cos idèntic)"""
+        entry = dict(entry, stored_at=time.time())
+        self._write(url, entry)
+
+    def record(self, stat):
+        """Incrementa un comptador d'estadístiques (segur entre fils)"""
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _write(self, url, entry):
+        atomic_io.write_json(self._path(url), entry, fsync=False)
+
+    def evict(self):
+        """
+        Elimina entrades velles (max_age) i, si cal, les més antigues fins
+        que el directori no superi max_size
+
+        Returns:
+            Nombre d'entrades eliminades
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            if not filename.endswith('.json'):
+                continue
+            try:
+                size = os.path.getsize(path)
+                with open(path, 'r', encoding='utf-8') as f:
+                    stored_at = json.load(f).get('stored_at', 0)
+            except (OSError, ValueError):
+                stored_at, size = 0, 0
+
+            if now - stored_at > self.max_age:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            else:
+                entries.append((stored_at, size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for stored_at, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+                total_size -= size
+            except OSError:
+                pass
+
+        return removed
@@ -0,0 +1,123 @@
+"""
+Sessió HTTP compartida per al scraper de MeteoCat
+Pool de connexions keep-alive, capçaleres per defecte i reintents a nivell de transport
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+import config_banner as cfg
+import instrumentation
+
+# Headers per semblar un navegador real (s'envien a totes les peticions de la sessió)
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ca,en-US;q=0.7,en;q=0.3',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Codis HTTP que val la pena reintentar
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Connexions que registren el temps de connexió i el TTFB a l'estació activa (veure instrumentation.py)
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with instrumentation.phase('connect'):
+            super().connect()
+
+    def getresponse(self, *args, **kwargs):
+        with instrumentation.phase('ttfb'):
+            return super().getresponse(*args, **kwargs)
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with instrumentation.phase('connect'):
+            super().connect()
+
+    def getresponse(self, *args, **kwargs):
+        with instrumentation.phase('ttfb'):
+            return super().getresponse(*args, **kwargs)
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+def get_timeout():
+    """Retorna el timeout de les peticions segons METEOcat_CONFIG"""
+    return cfg.METEOcat_CONFIG.get('timeout', 20)
+
+def create_session(pool_size=4, retries=True):
+    """
+    Crea una sessió per a una execució del scraper
+
+    Args:
+        pool_size: Connexions simultànies a mantenir obertes (nivell de concurrència)
+        retries: False per no reintentar res a nivell de transport (peticions de
+                 prova del circuit breaker: un sol intent, sense backoff)
+
+    Returns:
+        requests.Session amb pool, headers i reintents configurats
+    """
+    config = cfg.METEOcat_CONFIG
+    if retries:
+        retry = Retry(
+            total=config.get('max_retries', 3),
+            backoff_factor=config.get('backoff_factor', 2),
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    else:
+        retry = Retry(total=0, read=False, redirect=3, raise_on_status=False)
+    adapter = HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=max(1, pool_size),
+        pool_block=True,
+        max_retries=retry
+    )
+
+    adapter.poolmanager.pool_classes_by_scheme = {
+        'http': TimedHTTPConnectionPool,
+        'https': TimedHTTPSConnectionPool
+    }
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_connection_stats(session):
+    """
+    Compta les connexions noves i reutilitzades de la sessió
+
+    Returns:
+        dict amb 'requests', 'new' i 'reused'
+    """
+    stats = {'requests': 0, 'new': 0, 'reused': 0}
+    seen = set()
+
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats['requests'] += pool.num_requests
+            stats['new'] += pool.num_connections
+
+    stats['reused'] = max(0, stats['requests'] - stats['new'])
+    return stats
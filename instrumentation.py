@@ -0,0 +1,256 @@
+"""
+Instrumentació del scraper: temps per fase i estació, reintents i bytes
+
+Cada fil del scraper registra les fases de l'estació que està processant:
+    wait      - espera del limitador global de peticions (RateLimiter); no compta
+                al temps total de l'estació, que així no inclou la cua
+    connect   - DNS + TCP (+ TLS) de les connexions noves (http_session)
+    ttfb      - des de l'enviament fins a tenir les capçaleres de resposta
+    download  - lectura del cos de la resposta
+    parse     - anàlisi HTML (html_parsers.parse_page)
+    extract   - extracció de TX/TN/PPT de les files o del text
+La resta de mòduls només criden phase()/count(), que no fan res si no hi ha
+cap estació activa al fil (per exemple, fora de RunMetrics.station()).
+
+El resum de l'execució va a la metadata de latest_weather.json; opcionalment
+s'exporta en format de text de Prometheus o OpenMetrics (export_metrics) i es
+pot activar un perfilador per mostreig que desa piles "folded" per a
+flamegraph.pl / speedscope (SamplingProfiler).
+"""
+
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import atomic_io
+import config_banner as cfg
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('wait', 'connect', 'ttfb', 'download', 'parse', 'extract')
+
+_local = threading.local()
+
+def _config():
+    return getattr(cfg, 'INSTRUMENTATION_CONFIG', {})
+
+class StationMetrics:
+    """Temps (s) per fase i comptadors d'una estació (total sense l'espera del limitador)"""
+
+    __slots__ = ('code', 'phases', 'counters', 'total')
+
+    def __init__(self, code):
+        self.code = code
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.counters = {'attempts': 0, 'retries': 0, 'bytes': 0}
+        self.total = 0.0
+
+@contextmanager
+def phase(name):
+    """Suma el temps del bloc a la fase 'name' de l'estació activa del fil"""
+    metrics = getattr(_local, 'station', None)
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[name] = metrics.phases.get(name, 0.0) + time.perf_counter() - start
+
+def count(name, value=1):
+    """Suma value al comptador 'name' de l'estació activa del fil"""
+    metrics = getattr(_local, 'station', None)
+    if metrics is not None:
+        metrics.counters[name] = metrics.counters.get(name, 0) + value
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * fraction) - 1)] if ordered else 0.0
+
+class RunMetrics:
+    """Mètriques d'una execució: estacions i etapes (scrape, write...)"""
+
+    def __init__(self):
+        self.stations = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def station(self, code):
+        """Activa el registre de l'estació 'code' al fil actual"""
+        metrics = StationMetrics(code)
+        _local.station = metrics
+        start = time.perf_counter()
+        try:
+            yield metrics
+        finally:
+            metrics.total = time.perf_counter() - start - metrics.phases['wait']
+            _local.station = None
+            with self._lock:
+                self.stations[code] = metrics
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.perf_counter() - start, 4)
+
+    def log_stages(self):
+        """Escriu el temps de cada etapa al log (mateix fil de sortida que la resta)"""
+        logger.info("⏱️  TEMPS PER ETAPA")
+        for name, seconds in self.stages.items():
+            logger.info("   %-8s %8.3f s", name, seconds)
+        logger.info("   %-8s %8.3f s", 'total', sum(self.stages.values()))
+
+    def summary(self, slowest=5):
+        """Resum per a la metadata: per fase (ms), totals i estacions més lentes"""
+        stations = list(self.stations.values())
+        phases = {}
+        for name in PHASES:
+            values = [metrics.phases[name] * 1000 for metrics in stations if metrics.phases[name]]
+            if values:
+                phases[name] = {
+                    'count': len(values),
+                    'total_ms': round(sum(values), 1),
+                    'p50_ms': round(_percentile(values, 0.5), 2),
+                    'p95_ms': round(_percentile(values, 0.95), 2),
+                    'max_ms': round(max(values), 2)
+                }
+        totals = [metrics.total * 1000 for metrics in stations]
+        return {
+            'stations': len(stations),
+            'station_ms': {
+                'p50': round(_percentile(totals, 0.5), 2),
+                'p95': round(_percentile(totals, 0.95), 2),
+                'max': round(max(totals), 2) if totals else 0.0
+            },
+            'phases': phases,
+            'attempts': sum(metrics.counters['attempts'] for metrics in stations),
+            'retries': sum(metrics.counters['retries'] for metrics in stations),
+            'bytes': sum(metrics.counters['bytes'] for metrics in stations),
+            'slowest': [
+                {'station': metrics.code, 'ms': round(metrics.total * 1000, 1)}
+                for metrics in sorted(stations, key=lambda m: m.total, reverse=True)[:slowest]
+            ],
+            'stages': dict(self.stages)
+        }
+
+    def to_text(self, openmetrics=False):
+        """Mètriques en format de text de Prometheus (o OpenMetrics)"""
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels)
+                lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+
+        stations = sorted(self.stations.values(), key=lambda m: m.code)
+        family('meteo_station_phase_seconds', 'gauge', "Temps per fase i estació a l'última execució",
+               [((('station', m.code), ('phase', name)), round(m.phases[name], 6))
+                for m in stations for name in PHASES])
+        family('meteo_station_seconds', 'gauge', "Temps total per estació a l'última execució",
+               [((('station', m.code),), round(m.total, 6)) for m in stations])
+        for counter, help_text in (('attempts', 'Peticions fetes per estació'),
+                                   ('retries', 'Reintents per estació'),
+                                   ('bytes', 'Bytes descarregats per estació')):
+            family(f'meteo_station_{counter}', 'gauge', f"{help_text} a l'última execució",
+                   [((('station', m.code),), m.counters[counter]) for m in stations])
+        family('meteo_stage_seconds', 'gauge', "Temps per etapa de l'última execució",
+               [((('stage', name),), seconds) for name, seconds in self.stages.items()])
+        family('meteo_run_timestamp_seconds', 'gauge', "Final de l'última execució (epoch)",
+               [((), round(time.time(), 3))])
+
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+def export_metrics(metrics, path=None, metrics_format=None):
+    """
+    Escriu les mètriques (atòmicament, apte per al textfile collector de node_exporter)
+
+    Returns:
+        Ruta escrita, o None si l'exportació està desactivada
+    """
+    config = _config()
+    path = path or config.get('metrics_file')
+    if not path:
+        return None
+    metrics_format = metrics_format or config.get('metrics_format', 'prometheus')
+    atomic_io.write_text(path, metrics.to_text(openmetrics=metrics_format == 'openmetrics'), fsync=False)
+    return path
+
+class SamplingProfiler:
+    """
+    Perfilador per mostreig: cada interval es recullen les piles de tots els fils
+    i es compten en format "folded" (fil;mòdul:funció;... N), el que llegeixen
+    flamegraph.pl i speedscope. Només es desa si l'execució supera min_seconds.
+    """
+
+    def __init__(self, path, interval_ms=10, min_seconds=0):
+        self.path = path
+        self.interval = interval_ms / 1000
+        self.min_seconds = min_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    @classmethod
+    def from_config(cls):
+        """Perfilador segons INSTRUMENTATION_CONFIG (o METEO_PROFILE=1), o None si està desactivat"""
+        config = _config()
+        if not (config.get('profile', False) or os.environ.get('METEO_PROFILE') == '1'):
+            return None
+        return cls(config.get('profile_file', os.path.join(cfg.DATA_DIR, 'profile.folded')),
+                   config.get('profile_interval_ms', 10), config.get('profile_min_seconds', 0))
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """
+        Atura el mostreig i desa les piles si l'execució ha estat prou lenta
+
+        Returns:
+            Ruta escrita, o None
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        elapsed = time.perf_counter() - self._start
+        if elapsed < self.min_seconds or not self.stacks:
+            return None
+        lines = [f"{stack} {samples}" for stack, samples in self.stacks.most_common()]
+        atomic_io.write_text(self.path, '\n'.join(lines) + '\n', fsync=False)
+        logger.info("🔥 Perfil: %s mostres en %.1f s desades a %s", self.samples, elapsed, self.path)
+        return self.path
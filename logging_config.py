@@ -0,0 +1,123 @@
+"""
+Configuració del logging del scraper
+
+Els fils del scraper només posen cada registre a una cua (QueueHandler); un
+fil a part (QueueListener) el formata i l'escriu a scraper.log (amb rotació
+per mida) i a stdout. Així l'escriptura a disc no serialitza els fils.
+
+Formats:
+    text  - '2026-10-18 13:50:00,123 - INFO - missatge' (el de sempre)
+    json  - una línia JSON per registre, per a recol·lectors de logs:
+            {"ts": "...", "level": "INFO", "logger": "meteo_scraper",
+             "thread": "...", "msg": "...", ...camps de extra=}
+
+Configurable a LOGGING_CONFIG; METEO_LOG_LEVEL i METEO_LOG_JSON=1 el substitueixen.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+import config_banner as cfg
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Atributs estàndard d'un LogRecord: la resta venen de extra= i van al JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que conserva exc_info: el de la llibreria formata el missatge
+    (traça inclosa) abans de posar-lo a la cua, i el JSON no tindria el camp 'exc'.
+    Els registres només es llegeixen dins del procés, no cal que siguin serialitzables.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+class JsonLinesFormatter(logging.Formatter):
+    """Un objecte JSON per línia"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def _config():
+    return getattr(cfg, 'LOGGING_CONFIG', {})
+
+def configure_logging(level=None, json_lines=None, log_file=None):
+    """
+    Configura el logger arrel amb una cua i un fil escriptor (només la primera vegada)
+
+    Args:
+        level: Nivell ('DEBUG', 'INFO'...); per defecte LOGGING_CONFIG / METEO_LOG_LEVEL
+        json_lines: Format JSON per línia; per defecte LOGGING_CONFIG / METEO_LOG_JSON
+        log_file: Fitxer de log (rotació per mida); '' per no escriure'n cap
+
+    Returns:
+        El QueueListener actiu
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    config = _config()
+    level = level or os.environ.get('METEO_LOG_LEVEL') or config.get('level', 'INFO')
+    if json_lines is None:
+        json_lines = os.environ.get('METEO_LOG_JSON') == '1' or config.get('json', False)
+    if log_file is None:
+        log_file = config.get('file', 'scraper.log')
+
+    formatter = JsonLinesFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=config.get('max_bytes', 5 * 1024 * 1024),
+            backupCount=config.get('backup_count', 3),
+            encoding='utf-8'
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(log_queue)]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+def shutdown_logging():
+    """Buida la cua i atura el fil escriptor"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -5,39 +5,109 @@ AMB DETECCIÓ AUTOMÀTICA DE L'ESTRUCTURA HTML
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime, timezone
 import os
 import sys
 import re
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+import atomic_io
+import http_session
+from http_cache import HttpCache, hash_body
+import html_parsers
+from structure_cache import StructureCache, pattern_key, TEXT_KEY, NONE_KEY
+from raw_capture import RawCapture
+import scrape_journal
+from scheduler import Scheduler
+from station_health import StationHealth
+import historical_store
+import instrumentation
+import logging_config
+from weather_db import ObservationDB
+
+# El logging es configura a l'arrencada (logging_config.configure_logging), no en importar
 logger = logging.getLogger(__name__)
 
 # Importar configuració
+# (la llista d'estacions, cfg.STATIONS, no es llegeix de stations.json fins que cal)
 try:
     import config_banner as cfg
-    STATIONS = cfg.STATIONS
-    logger.info(f"✅ Carregades {len(STATIONS)} estacions de config_banner.py")
 except ImportError as e:
-    logger.error(f"❌ Error important config_banner.py: {e}")
-    sys.exit(1)
-except AttributeError as e:
-    logger.error(f"❌ Error: config_banner.py no té STATIONS: {e}")
+    logger.error("❌ Error important config_banner.py: %s", e)
     sys.exit(1)
 
-def scrape_station_data(station_code, station_name, max_retries=3):
+from station_registry import get_registry
+
+SCRAPER_CONFIG = getattr(cfg, 'SCRAPER_CONFIG', {})
+HTTP_CACHE_CONFIG = getattr(cfg, 'HTTP_CACHE_CONFIG', {})
+HISTORY_CONFIG = getattr(cfg, 'HISTORY_CONFIG', {})
+SQLITE_CONFIG = getattr(cfg, 'SQLITE_CONFIG', {})
+ROLLUPS_CONFIG = getattr(cfg, 'ROLLUPS_CONFIG', {})
+PARSER_CONFIG = getattr(cfg, 'PARSER_CONFIG', {})
+OUTPUT_CONFIG = getattr(cfg, 'OUTPUT_CONFIG', {})
+JOURNAL_CONFIG = getattr(cfg, 'JOURNAL_CONFIG', {})
+SCHEDULER_CONFIG = getattr(cfg, 'SCHEDULER_CONFIG', {})
+HEALTH_CONFIG = getattr(cfg, 'HEALTH_CONFIG', {})
+INSTRUMENTATION_CONFIG = getattr(cfg, 'INSTRUMENTATION_CONFIG', {})
+
+class RateLimiter:
+    """
+    Pressupost global de peticions per segon, compartit entre tots els fils.
+    Cada crida a acquire() reserva el següent forat lliure i espera fins aleshores.
+    """
+    
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second and requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+    
+    def acquire(self):
+        """Bloqueja fins que hi ha pressupost per fer una petició"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def station_url(station_code):
+    """URL de la pàgina de dades d'una estació (SCRAPER_CONFIG['base_url'])"""
+    base_url = SCRAPER_CONFIG.get('base_url', 'https://www.meteo.cat').rstrip('/')
+    return f"{base_url}/observacions/xema/dades?codi={station_code}"
+
+def build_station_record(station_name, url, values, observed_at=None):
+    """
+    Registre d'una estació amb èxit, amb l'esquema de latest_weather.json
+    
+    Args:
+        observed_at: Hora de l'observació (ISO); per defecte la de la descàrrega
+    """
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    return {
+        'success': True,
+        'values': values,
+        'metadata': {
+            'name': station_name,
+            'last_fetched': fetched_at,
+            'observed_at': observed_at or fetched_at,
+            'url': url
+        }
+    }
+
+def previous_observed_at(previous):
+    """Hora de l'observació d'un registre anterior (els antics només tenen last_fetched)"""
+    metadata = previous.get('metadata', {})
+    return metadata.get('observed_at') or metadata.get('last_fetched')
+
+def scrape_station_data(station_code, station_name, max_retries=3, rate_limiter=None, session=None,
+                        cache=None, previous=None, structure=None, capture=None):
     """
     Extreu dades meteorològiques d'una estació
     
@@ -45,128 +115,173 @@ def scrape_station_data(station_code, station_name, max_retries=3):
         station_code: Codi de l'estació (ex: 'XJ')
         station_name: Nom de l'estació per logging
         max_retries: Intents màxims en cas d'error
+        rate_limiter: RateLimiter compartit (opcional) que s'aplica a cada petició
+        session: Sessió HTTP compartida (http_session.create_session); si no n'hi ha, se'n crea una
+        cache: HttpCache per fer peticions condicionals (opcional)
+        previous: Registre de l'execució anterior, reutilitzat si la pàgina no ha canviat
+        structure: StructureCache amb l'ordre de patrons après (opcional)
+        capture: RawCapture per desar respostes en brut (mostreig o fallades)
     
     Returns:
         dict amb dades de l'estació o None si error
     """
-    url = f"https://www.meteo.cat/observacions/xema/dades?codi={station_code}"
+    url = station_url(station_code)
     
-    for attempt in range(max_retries):
-        try:
-            # Headers per semblar un navegador real
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'ca,en-US;q=0.7,en;q=0.3',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
+    own_session = session is None
+    if own_session:
+        session = http_session.create_session(pool_size=1)
+    timeout = http_session.get_timeout()
+    
+    # Només fem peticions condicionals si tenim valors vàlids per reutilitzar
+    cache_entry = None
+    if cache and previous and previous.get('success'):
+        cache_entry = cache.get(url)
+        if not cache.is_valid_for(cache_entry, previous.get('values')):
+            cache_entry = None
+    
+    try:
+        for attempt in range(max_retries):
+            response = None
+            try:
+                logger.debug("Intent %s/%s: Scraping %s - %s", attempt + 1, max_retries, station_code, station_name)
             
-            logger.info(f"Intent {attempt + 1}/{max_retries}: Scraping {station_code} - {station_name}")
+                # Respectar el pressupost global de peticions (fase 'wait', fora del total)
+                if rate_limiter:
+                    with instrumentation.phase('wait'):
+                        rate_limiter.acquire()
             
-            # Fer la petició amb timeout
-            response = requests.get(url, headers=headers, timeout=20)
-            response.raise_for_status()
+                # Fer la petició amb timeout (headers i reintents de transport a la sessió).
+                # stream=True: el cos es llegeix a part per mesurar la descàrrega
+                instrumentation.count('attempts')
+                if attempt:
+                    instrumentation.count('retries')
+                response = session.get(url, headers=cache.conditional_headers(cache_entry) if cache_entry else None,
+                                       timeout=timeout, stream=True)
+                retries = getattr(response.raw, 'retries', None)
+                if retries is not None and retries.history:
+                    instrumentation.count('retries', len(retries.history))
+                with instrumentation.phase('download'):
+                    instrumentation.count('bytes', len(response.content))
             
-            # Verificar contingut
-            if not response.content:
-                logger.warning(f"Resposta buida per a {station_code}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
-                return None
+                # 304: la pàgina no ha canviat, reutilitzar els valors anteriors
+                if cache_entry and response.status_code == 304:
+                    cache.touch(url, cache_entry)
+                    cache.record('not_modified')
+                    logger.info("♻️  %s: sense canvis (304), reutilitzant valors anteriors", station_code)
+                    return build_station_record(station_name, url, dict(previous['values']),
+                                                previous_observed_at(previous))
             
-            # Analitzar HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+                response.raise_for_status()
             
-            # DEBUG: Guardar HTML per inspeccionar (opcional)
-            if station_code in ['XJ', 'VK']:  # Per a debug
-                with open(f'debug_{station_code}.html', 'w', encoding='utf-8') as f:
-                    f.write(soup.prettify())
-                logger.info(f"DEBUG: HTML guardat a debug_{station_code}.html")
+                # Cos idèntic a l'anterior: no cal tornar a analitzar
+                body_hash = hash_body(response.content)
+                if cache_entry and response.content and cache_entry.get('body_hash') == body_hash:
+                    cache.touch(url, cache_entry)
+                    cache.record('unchanged_body')
+                    logger.info("♻️  %s: contingut idèntic, reutilitzant valors anteriors", station_code)
+                    return build_station_record(station_name, url, dict(previous['values']),
+                                                previous_observed_at(previous))
             
-            # INTENT 1: Buscar per múltiples patrons de taula
-            table = None
-            table_patterns = [
-                {'class': 'table-dades'},
-                {'class': 'taula-dades'},
-                {'class': 'dades-table'},
-                {'id': 'taula-dades'},
-                {'id': 'table-dades'},
-                {'class': 'table'},
-                {'class': 'taula'}
-            ]
+                # Verificar contingut
+                if not response.content:
+                    logger.warning("Resposta buida per a %s", station_code)
+                    if attempt < max_retries - 1:
+                        time.sleep(2)
+                        continue
+                    return None
             
-            for pattern in table_patterns:
-                table = soup.find('table', pattern)
-                if table:
-                    logger.debug(f"✅ Taula trobada amb patró: {pattern}")
-                    break
+                # DEBUG: Guardar la resposta en brut de les estacions mostrejades
+                if capture and capture.wants(station_code):
+                    capture.submit(station_code, response.content, 'sample')
             
-            if table:
-                values = extract_from_table(table)
-            else:
-                # INTENT 2: Buscar dades per text
-                logger.warning(f"No s'ha trobat taula per {station_code}, buscant per text...")
-                values = extract_from_text(soup.get_text())
+                # Analitzar HTML (backend configurable, BeautifulSoup com a fallback)
+                patterns = structure.ordered_patterns() if structure else html_parsers.TABLE_PATTERNS
+                with instrumentation.phase('parse'):
+                    page = html_parsers.parse_page(response.content, backend=PARSER_CONFIG.get('backend', 'auto'),
+                                                   patterns=patterns)
             
-            # Verificar que tenim algun valor
-            if any(v != '-' for v in values.values()):
-                logger.info(f"✅ {station_code}: TX={values.get('TX', '-')}°C, TN={values.get('TN', '-')}°C, PPT={values.get('PPT', '-')}mm")
-                return {
-                    'success': True,
-                    'values': values,
-                    'metadata': {
-                        'name': station_name,
-                        'last_fetched': datetime.now(timezone.utc).isoformat(),
-                        'url': url
-                    }
-                }
-            else:
-                logger.warning(f"No s'han trobat dades per {station_code}")
-                if attempt < max_retries - 1:
-                    time.sleep(3)
-                    continue
-                return None
+                if page.has_table:
+                    # INTENT 1: Taula de dades trobada per algun dels patrons
+                    logger.debug("✅ Taula trobada amb patró: %s (%s)", page.pattern, page.backend)
+                    with instrumentation.phase('extract'):
+                        values = extract_from_rows(page.rows)
+                else:
+                    # INTENT 2: Buscar dades per text
+                    logger.warning("No s'ha trobat taula per %s, buscant per text...", station_code)
+                    with instrumentation.phase('extract'):
+                        values = extract_from_text(page.text)
+            
+                found = any(v != '-' for v in values.values())
+                if structure:
+                    if page.has_table:
+                        structure.record(pattern_key(page.pattern))
+                    else:
+                        structure.record(TEXT_KEY if found else NONE_KEY)
+            
+                # Verificar que tenim algun valor
+                if found:
+                    logger.info("✅ %s: TX=%s°C, TN=%s°C, PPT=%smm", station_code,
+                                values.get('TX', '-'), values.get('TN', '-'), values.get('PPT', '-'))
+                    if cache:
+                        cache.store(url, response, body_hash, values)
+                        cache.record('misses')
+                    return build_station_record(station_name, url, values)
+                else:
+                    logger.warning("No s'han trobat dades per %s", station_code)
+                    if capture and capture.wants(station_code, failed=True):
+                        capture.submit(station_code, response.content, 'no_data')
+                    if attempt < max_retries - 1:
+                        time.sleep(3)
+                        continue
+                    return None
                 
-        except requests.exceptions.Timeout:
-            logger.warning(f"Timeout per a {station_code} (intent {attempt + 1})")
-            if attempt < max_retries - 1:
-                time.sleep(3)
-                continue
-            return None
+            # Els errors de xarxa ja s'han reintentat amb backoff a la sessió
+            except requests.exceptions.Timeout:
+                logger.warning("Timeout per a %s (intent %s)", station_code, attempt + 1)
+                return None
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error de xarxa per a {station_code}: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2)
-                continue
-            return None
+            except requests.exceptions.RequestException as e:
+                logger.error("Error de xarxa per a %s: %s", station_code, e)
+                return None
             
-        except Exception as e:
-            logger.error(f"Error inesperat scraping {station_code}: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2)
-                continue
-            return None
+            except Exception as e:
+                logger.error("Error inesperat scraping %s: %s", station_code, e)
+                if capture and response is not None and capture.wants(station_code, failed=True):
+                    capture.submit(station_code, response.content, 'error')
+                if attempt < max_retries - 1:
+                    time.sleep(2)
+                    continue
+                return None
     
-    return None
+        return None
+    finally:
+        # Sessió creada aquí (crida sense sessió compartida): tancar-la
+        if own_session:
+            session.close()
 
 def extract_from_table(table):
-    """Extreu dades d'una taula HTML"""
+    """Extreu dades d'una taula HTML (element de BeautifulSoup)"""
+    try:
+        rows = [
+            [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+            for row in table.find_all('tr')
+        ]
+    except Exception as e:
+        logger.debug("Error extreient de taula: %s", e)
+        rows = []
+    
+    return extract_from_rows(rows)
+
+def extract_from_rows(rows):
+    """Extreu dades de les files d'una taula (llista de textos de cel·la per fila)"""
     values = {'TX': '-', 'TN': '-', 'PPT': '-'}
     
     try:
-        # Buscar totes les files
-        rows = table.find_all('tr')
-        
-        for row in rows:
-            cells = row.find_all(['td', 'th'])
+        for cells in rows:
             if len(cells) >= 2:
                 # Text de la cel·la d'esquerra (variable)
-                var_text = cells[0].get_text(strip=True).upper()
-                val_text = cells[1].get_text(strip=True)
+                var_text = cells[0].upper()
+                val_text = cells[1]
                 
                 # Buscar números amb regex
                 numbers = re.findall(r'[-+]?\d*[.,]?\d+', val_text)
@@ -184,7 +299,7 @@ def extract_from_table(table):
                     except ValueError:
                         pass
     except Exception as e:
-        logger.debug(f"Error extreient de taula: {e}")
+        logger.debug("Error extreient de taula: %s", e)
     
     return values
 
@@ -219,90 +334,349 @@ def extract_from_text(full_text):
                 pass
         
     except Exception as e:
-        logger.debug(f"Error extreient de text: {e}")
+        logger.debug("Error extreient de text: %s", e)
     
     return values
 
-def main():
-    """Funció principal"""
+def load_previous_data(data_file='data/latest_weather.json'):
+    """Carrega les estacions de l'execució anterior (per reutilitzar valors sense canvis)"""
+    try:
+        with open(data_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('stations', {})
+    except (OSError, ValueError):
+        return {}
+
+def process_station(station, position, total, rate_limiter=None, session=None, cache=None, previous=None,
+                    structure=None, capture=None, max_retries=3, metrics=None):
+    """
+    Processa una estació i retorna sempre un registre amb l'esquema de sortida
+    (success/values/metadata), tant si ha anat bé com si ha fallat
+    """
+    station_code = station['code']
+    station_name = station['display_name']
+    
+    logger.info("[%s/%s] Processant %s - %s", position, total, station_code, station_name)
+    
+    try:
+        with metrics.station(station_code) if metrics else nullcontext():
+            station_data = scrape_station_data(station_code, station_name, max_retries, rate_limiter=rate_limiter,
+                                               session=session, cache=cache, previous=previous,
+                                               structure=structure, capture=capture)
+    except Exception as e:
+        logger.error("Error inesperat processant %s: %s", station_code, e)
+        station_data = None
+    
+    if station_data and station_data['success']:
+        return station_data
+    
+    return failed_record(station)
+
+def failed_record(station, error='No s\'han pogut obtenir dades'):
+    """Registre d'una estació sense dades, amb l'esquema de latest_weather.json"""
+    return {
+        'success': False,
+        'values': {'TX': '-', 'TN': '-', 'PPT': '-'},
+        'metadata': {
+            'name': station['display_name'],
+            'last_fetched': datetime.now(timezone.utc).isoformat(),
+            'url': station_url(station['code']),
+            'error': error
+        }
+    }
+
+def scrape_all(max_workers=None, requests_per_second=None, resume=True, metrics=None):
+    """
+    Descarrega i analitza totes les estacions, sense escriure latest_weather.json
+    
+    Cada resultat s'afegeix al diari (JOURNAL_CONFIG) tan bon punt acaba, i les
+    dades finals es construeixen a partir del diari.
+    
+    Args:
+        max_workers: Nombre de fils concurrents (per defecte SCRAPER_CONFIG)
+        requests_per_second: Pressupost global de peticions (per defecte SCRAPER_CONFIG)
+        resume: Reprendre el diari d'una execució interrompuda (només es descarreguen
+                les estacions que hi falten, fallides o antigues)
+        metrics: instrumentation.RunMetrics on registrar temps i comptadors (per defecte
+                 se'n crea un si INSTRUMENTATION_CONFIG està activat)
+    
+    Returns:
+        dict amb 'metadata' i 'stations' (format de latest_weather.json)
+    """
+    stations = cfg.STATIONS
     logger.info("=" * 60)
     logger.info("🚀 INICIANT METEO SCRAPER - VERSIÓ ACTUALITZADA")
-    logger.info(f"📊 Estacions a processar: {len(STATIONS)}")
+    logger.info("📊 Estacions a processar: %s", len(stations))
     logger.info("=" * 60)
     
-    # Crear directori de dades
-    os.makedirs('data', exist_ok=True)
-    
     # Diccionari per dades
     all_data = {
         'metadata': {
             'last_updated': datetime.now(timezone.utc).isoformat(),
             'source': 'meteocat_web_scraping',
-            'stations_count': len(STATIONS),
+            'stations_count': len(stations),
             'version': '2.0'
         },
         'stations': {}
     }
     
-    # Processar estacions
-    success_count = 0
-    failed_stations = []
+    # Processar estacions en paral·lel (concurrència limitada + pressupost global)
+    if max_workers is None:
+        max_workers = SCRAPER_CONFIG.get('max_workers', 4)
+    if requests_per_second is None:
+        requests_per_second = SCRAPER_CONFIG.get('requests_per_second', 1.0)
+    max_workers = max(1, int(max_workers))
+    rate_limiter = RateLimiter(requests_per_second)
     
-    for i, station in enumerate(STATIONS, 1):
-        station_code = station['code']
-        station_name = station['display_name']
-        
-        logger.info(f"[{i}/{len(STATIONS)}] Processant {station_code} - {station_name}")
-        
-        # Scraping
-        station_data = scrape_station_data(station_code, station_name)
-        
-        if station_data and station_data['success']:
-            all_data['stations'][station_code] = station_data
-            success_count += 1
-        else:
-            # Estació fallida
-            all_data['stations'][station_code] = {
-                'success': False,
-                'values': {'TX': '-', 'TN': '-', 'PPT': '-'},
-                'metadata': {
-                    'name': station_name,
-                    'last_fetched': datetime.now(timezone.utc).isoformat(),
-                    'url': f"https://www.meteo.cat/observacions/xema/dades?codi={station_code}",
-                    'error': 'No s\'han pogut obtenir dades'
-                }
-            }
-            failed_stations.append(station_code)
-        
-        # Esperar entre peticions
-        time.sleep(2)  # Augmentat per evitar bloqueig
+    logger.info("⚙️  Fils: %s | Límit: %s peticions/s", max_workers, requests_per_second)
+    
+    # Una sola sessió per execució: el pool té tantes connexions com fils
+    session = http_session.create_session(pool_size=max_workers)
+    
+    # Caché HTTP: peticions condicionals contra els valors de l'execució anterior
+    cache = None
+    if HTTP_CACHE_CONFIG.get('enabled', True):
+        cache = HttpCache()
+        evicted = cache.evict()
+        if evicted:
+            logger.info("🧹 Caché HTTP: %s entrades eliminades", evicted)
+    previous_stations = load_previous_data()
+    
+    # Ordre de patrons après a execucions anteriors
+    structure = StructureCache()
+    
+    # Captura en brut (desactivada per defecte, veure RAW_CAPTURE_CONFIG)
+    capture = RawCapture().start()
+    
+    # Diari: les estacions recents d'una execució interrompuda no es tornen a descarregar
+    journal = None
+    resumed = {}
+    if JOURNAL_CONFIG.get('enabled', True):
+        journal = scrape_journal.ScrapeJournal().open(resume=resume)
+        if journal.resumed:
+            resumed = journal.fresh_records()
+            logger.info("♻️  Reprenent execució interrompuda: %s estacions ja fetes al diari", len(resumed))
+    pending = [station for station in stations if station['code'] not in resumed]
     
-    # Guardar dades
-    output_file = 'data/latest_weather.json'
+    # Circuit breaker: les estacions que fallen seguit no es consulten fins al seu cooldown
+    health = None
+    reused = {}
+    if HEALTH_CONFIG.get('enabled', True):
+        health = StationHealth().load()
+        allowed = []
+        for station in pending:
+            if health.allow(station['code']):
+                allowed.append(station)
+            else:
+                next_probe = health.stations[station['code']].get('next_probe', '')
+                reused[station['code']] = failed_record(station, f"Circuit obert fins a {next_probe}")
+        if reused:
+            logger.info("🔌 Circuit obert: %s estacions en pausa (%s)", len(reused), ', '.join(reused))
+        pending = allowed
+    
+    # Planificador: només les estacions que toquen, dins del pressupost de peticions
+    scheduler = None
+    if SCHEDULER_CONFIG.get('enabled', False):
+        scheduler = Scheduler().load()
+        pending, skipped = scheduler.select(pending, previous_stations)
+        for station in skipped:
+            # Un registre fallit o d'un dia anterior no es reutilitza: TX/TN/PPT són del dia
+            previous = previous_stations.get(station['code'])
+            reused[station['code']] = previous if scheduler.is_current(previous) \
+                else failed_record(station, "Ajornada pel planificador (sense dades d'avui)")
+        logger.info("🗓️  Planificador: %s estacions a descarregar, %s reutilitzades (%s ajornades pel pressupost)",
+                    len(pending), len(skipped), scheduler.stats['deferred'])
+    
+    # Les peticions de prova (half_open) van per una sessió sense reintents de transport:
+    # un sol intent, sense backoff, per a una estació que probablement continua caiguda
+    probe_session = None
+    if health and any(health.is_probe(station['code']) for station in pending):
+        probe_session = http_session.create_session(pool_size=max_workers, retries=False)
+    
+    # Temps per fase, reintents i bytes per estació (veure instrumentation.py)
+    if metrics is None and INSTRUMENTATION_CONFIG.get('enabled', True):
+        metrics = instrumentation.RunMetrics()
+    
+    results = dict(resumed)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                metrics.stage('scrape') if metrics else nullcontext():
+            futures = {}
+            for i, station in enumerate(pending, 1):
+                probe = probe_session is not None and health.is_probe(station['code'])
+                if probe:
+                    health.start_probe(station['code'])
+                futures[executor.submit(process_station, station, i, len(pending), rate_limiter,
+                                        probe_session if probe else session, cache,
+                                        previous_stations.get(station['code']), structure, capture,
+                                        1 if probe else 3, metrics)] = station['code']
+            for future in as_completed(futures):
+                station_code = futures[future]
+                results[station_code] = future.result()
+                if journal:
+                    journal.append(station_code, results[station_code])
+                if scheduler:
+                    scheduler.observe(station_code, results[station_code], previous_stations.get(station_code))
+                if health:
+                    health.record(station_code, results[station_code]['success'])
+        connection_stats = http_session.get_connection_stats(session)
+        if probe_session:
+            for key, value in http_session.get_connection_stats(probe_session).items():
+                connection_stats[key] += value
+    finally:
+        session.close()
+        if probe_session:
+            probe_session.close()
+        capture.close()
+        if journal:
+            journal.close()
+    
+    if capture.captured:
+        logger.info("🔎 DEBUG: %s respostes desades a %s", capture.captured, capture.directory)
+    
+    all_data['metadata']['connections'] = connection_stats
+    if metrics:
+        all_data['metadata']['instrumentation'] = metrics.summary()
+    if resumed:
+        all_data['metadata']['resumed_stations'] = len(resumed)
+    if health:
+        all_data['metadata']['breakers'] = health.summary()
+        health.retain(station['code'] for station in stations)
+        try:
+            health.save()
+        except OSError as e:
+            logger.warning("No s'ha pogut desar l'estat de les estacions: %s", e)
+    if scheduler:
+        all_data['metadata']['schedule'] = dict(scheduler.stats)
+        scheduler.retain(station['code'] for station in stations)
+        try:
+            scheduler.save()
+        except OSError as e:
+            logger.warning("No s'ha pogut desar el planificador: %s", e)
+    if cache:
+        all_data['metadata']['http_cache'] = dict(cache.stats)
+    
+    structure_summary = structure.run_summary()
+    all_data['metadata']['structure'] = structure_summary
+    baseline_fallback = structure.baseline_fallback_rate()
+    if structure_summary['pages'] and baseline_fallback is not None \
+            and structure_summary['fallback_rate'] - baseline_fallback >= 0.2:
+        logger.warning("⚠️  Pic d'ús del fallback (%.0f%% vs %.0f%% habitual): possible canvi de disseny de meteo.cat",
+                       100 * structure_summary['fallback_rate'], 100 * baseline_fallback)
+    try:
+        structure.save()
+    except OSError as e:
+        logger.warning("No s'ha pogut desar la memòria d'estructura: %s", e)
+    
+    # Mantenir l'ordre de STATIONS a la sortida (registres represos del diari i
+    # descarregats ara; valors anteriors per a les estacions que no tocaven)
+    results = {**reused, **results}
+    for station in stations:
+        all_data['stations'][station['code']] = results[station['code']]
+    
+    return all_data
+
+def save_data(all_data, output_file='data/latest_weather.json'):
+    """Guarda les dades a latest_weather.json. Retorna True si s'ha pogut desar"""
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"✅ Dades guardades a {output_file}")
+        # JSON compacte, escrit a un temporal i renomenat (cap lector veu un fitxer a mitges)
+        pretty_path = None
+        if OUTPUT_CONFIG.get('pretty_json', False):
+            pretty_path = f"{os.path.splitext(output_file)[0]}.pretty.json"
+        atomic_io.write_json(output_file, all_data, pretty_path=pretty_path)
+        logger.info("✅ Dades guardades a %s", output_file)
+        
+        # Les dades ja són a latest_weather.json: el diari de l'execució ja no cal
+        scrape_journal.discard()
         
         # Mostrar data actual
         file_time = datetime.fromtimestamp(os.path.getmtime(output_file))
-        logger.info(f"📅 Data del fitxer: {file_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info("📅 Data del fitxer: %s", file_time.strftime('%Y-%m-%d %H:%M:%S'))
+        return True
         
     except Exception as e:
-        logger.error(f"❌ Error guardant fitxer: {e}")
-        return
+        logger.error("❌ Error guardant fitxer: %s", e)
+        return False
+
+def store_run(all_data, db_path=None):
+    """
+    Desa l'execució als magatzems d'observacions: històric binari, rollups i SQLite
+    
+    Args:
+        db_path: Base de dades SQLite (per defecte SQLITE_CONFIG)
+    """
+    # Afegir a l'històric per estació
+    if HISTORY_CONFIG.get('enabled', True):
+        try:
+            appended = historical_store.append_run(all_data)
+            logger.info("🗄️  Històric: %s observacions afegides a %s", appended, cfg.HISTORICAL_DIR)
+        except Exception as e:
+            logger.error("❌ Error actualitzant l'històric: %s", e)
+        
+        # Rollups diaris i finestres mòbils (opcional, necessita numpy)
+        if ROLLUPS_CONFIG.get('enabled', False):
+            try:
+                import rollups
+                station_rollups = rollups.Rollups()
+                station_rollups.update([station['code'] for station in cfg.STATIONS])
+                station_rollups.save()
+                logger.info("📈 Rollups actualitzats: %s estacions, %s dies",
+                            len(station_rollups.stations), station_rollups.n_days)
+            except Exception as e:
+                logger.error("❌ Error calculant rollups: %s", e)
+    
+    # Base de dades SQLite (opcional)
+    if db_path or SQLITE_CONFIG.get('enabled', False):
+        try:
+            with ObservationDB(db_path) as db:
+                inserted = db.write_run(all_data)
+            logger.info("🗃️  SQLite: %s observacions noves a %s", inserted, db.path)
+        except Exception as e:
+            logger.error("❌ Error desant a SQLite: %s", e)
+
+def log_summary(all_data):
+    """Mostra el resum de l'execució"""
+    metadata = all_data['metadata']
+    success_count = sum(1 for data in all_data['stations'].values() if data['success'])
+    failed_stations = [code for code, data in all_data['stations'].items() if not data['success']]
     
     # Resum
     logger.info("=" * 60)
     logger.info("📊 RESUM DE L'EXECUCIÓ")
-    logger.info(f"✅ Estacions amb èxit: {success_count}/{len(STATIONS)}")
-    logger.info(f"❌ Estacions fallides: {len(failed_stations)}")
+    logger.info("✅ Estacions amb èxit: %s/%s", success_count, len(all_data['stations']))
+    logger.info("❌ Estacions fallides: %s", len(failed_stations))
+    
+    structure_summary = metadata.get('structure', {})
+    if structure_summary.get('pages'):
+        logger.info("🧭 Patró preferit: %s | Fallback: %.0f%%",
+                    structure_summary['preferred'], 100 * structure_summary['fallback_rate'])
+    cache_stats = metadata.get('http_cache')
+    if cache_stats:
+        logger.info("♻️  Caché HTTP: %s sense canvis (304), %s amb cos idèntic",
+                    cache_stats['not_modified'], cache_stats['unchanged_body'])
+    connection_stats = metadata.get('connections')
+    if connection_stats:
+        logger.info("🔌 Connexions: %s noves, %s reutilitzades (%s peticions)",
+                    connection_stats['new'], connection_stats['reused'], connection_stats['requests'])
+    
+    timings = metadata.get('instrumentation')
+    if timings and timings['stations']:
+        phases = ' | '.join(f"{name} {phase['p50_ms']:.0f}/{phase['p95_ms']:.0f}"
+                            for name, phase in timings['phases'].items())
+        logger.info("⏱️  ms per estació (p50/p95): total %.0f/%.0f | %s",
+                    timings['station_ms']['p50'], timings['station_ms']['p95'], phases)
+        logger.info("🔁 Peticions: %s (%s reintents), %.0f KB descarregats",
+                    timings['attempts'], timings['retries'], timings['bytes'] / 1024)
+    
+    breakers = metadata.get('breakers')
+    if breakers and (breakers['open'] or breakers['probed']):
+        logger.info("🔌 Circuit breaker: %s obertes, %s provades, %s recuperades",
+                    len(breakers['open']), len(breakers['probed']), len(breakers['recovered']))
     
     if failed_stations:
         logger.info("Llista d'estacions fallides:")
+        registry = get_registry()
         for failed in failed_stations:
-            station_name = next((s['display_name'] for s in STATIONS if s['code'] == failed), failed)
-            logger.info(f"   - {failed}: {station_name}")
+            logger.info("   - %s: %s", failed, registry.display_name(failed))
     
     logger.info("=" * 60)
     
@@ -314,16 +688,63 @@ def main():
             if data['success'] and sample_count < 3:
                 values = data['values']
                 name = data['metadata']['name']
-                logger.info(f"   {station_code} - {name}:")
-                logger.info(f"     TX: {values.get('TX', '-')}°C | TN: {values.get('TN', '-')}°C | PPT: {values.get('PPT', '-')}mm")
+                logger.info("   %s - %s:", station_code, name)
+                logger.info("     TX: %s°C | TN: %s°C | PPT: %smm",
+                            values.get('TX', '-'), values.get('TN', '-'), values.get('PPT', '-'))
                 sample_count += 1
 
+def export_metrics(metrics):
+    """Exporta les mètriques de l'execució si INSTRUMENTATION_CONFIG['metrics_file'] està definit"""
+    if not metrics:
+        return
+    try:
+        path = instrumentation.export_metrics(metrics)
+        if path:
+            logger.info("📐 Mètriques exportades a %s", path)
+    except OSError as e:
+        logger.warning("No s'han pogut exportar les mètriques: %s", e)
+
+def main(max_workers=None, requests_per_second=None, db_path=None):
+    """
+    Funció principal: scraping, guardar latest_weather.json, històric i resum
+    
+    Args:
+        max_workers: Nombre de fils concurrents (per defecte SCRAPER_CONFIG)
+        requests_per_second: Pressupost global de peticions (per defecte SCRAPER_CONFIG)
+        db_path: Base de dades SQLite on desar les observacions (per defecte SQLITE_CONFIG)
+    
+    Returns:
+        Les dades de l'execució, o None si no s'han pogut desar
+    """
+    metrics = instrumentation.RunMetrics() if INSTRUMENTATION_CONFIG.get('enabled', True) else None
+    profiler = instrumentation.SamplingProfiler.from_config()
+    if profiler:
+        profiler.start()
+    
+    try:
+        all_data = scrape_all(max_workers, requests_per_second, metrics=metrics)
+        
+        with metrics.stage('write') if metrics else nullcontext():
+            saved = save_data(all_data)
+        if not saved:
+            return None
+        
+        with metrics.stage('store') if metrics else nullcontext():
+            store_run(all_data, db_path)
+        log_summary(all_data)
+        export_metrics(metrics)
+        return all_data
+    finally:
+        if profiler:
+            profiler.stop()
+
 if __name__ == "__main__":
+    logging_config.configure_logging()
     try:
         main()
     except KeyboardInterrupt:
         logger.info("\n⏹️  Execució interrompuda per l'usuari")
     except Exception as e:
-        logger.error(f"❌ Error crític: {e}")
+        logger.error("❌ Error crític: %s", e)
         import traceback
         traceback.print_exc()
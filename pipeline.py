@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+PIPELINE COMPLET EN UN SOL PROCÉS
+Scraping → emmagatzematge → render del banner, amb les dades passades en memòria
+i totes les escriptures a disc al final. Mostra el temps de cada etapa.
+
+Ús:
+    python pipeline.py                  # Execució completa
+    python pipeline.py --skip-scrape    # Només render, a partir de data/latest_weather.json
+    python pipeline.py --source api     # Dades de l'API oficial (cal METEOCAT_API_KEY)
+
+meteo_scraper.py i generate_banner.py continuen funcionant per separat.
+"""
+
+import argparse
+import logging
+import sys
+
+import config_banner as cfg
+import data_sources
+import generate_banner
+import instrumentation
+import logging_config
+import meteo_scraper
+import rss_feed
+from fragment_cache import FragmentCache
+from render_context import RenderContext
+
+logger = logging.getLogger(__name__)
+
+RSS_CONFIG = getattr(cfg, 'RSS_CONFIG', {})
+
+def run_pipeline(skip_scrape=False, max_workers=None, requests_per_second=None, db_path=None, resume=True,
+                 source=None):
+    """
+    Executa tota la pipeline
+
+    Args:
+        source: Origen de les dades ('auto', 'web', 'api'; per defecte DATA_SOURCE_CONFIG)
+
+    Returns:
+        dict amb els temps per etapa, o None si hi ha hagut un error
+    """
+    # Els temps per etapa sempre; les mètriques per estació només si la instrumentació està activa
+    metrics = instrumentation.RunMetrics()
+    instrumented = getattr(cfg, 'INSTRUMENTATION_CONFIG', {}).get('enabled', True)
+
+    # 1. Scraping o API (només en memòria)
+    with metrics.stage('scrape'):
+        if skip_scrape:
+            data = generate_banner.load_data()
+        else:
+            try:
+                data = data_sources.fetch_data(source, metrics if instrumented else None, max_workers,
+                                               requests_per_second, resume)
+            except data_sources.DataSourceError as e:
+                logger.error("❌ Error obtenint les dades: %s", e)
+                return None
+    if data is None:
+        return None
+
+    # 2. Render del banner amb les dades en memòria
+    with metrics.stage('render'):
+        template = generate_banner.load_template()
+        if not template:
+            return None
+        fragment_cache = FragmentCache(version=generate_banner.FRAGMENT_VERSION).load()
+        context = RenderContext()
+        feed, previous_feed = generate_banner.prepare_feed(data, template, context)
+        html, station_count = generate_banner.render_banner(data, template, fragment_cache, context, feed)
+    logger.info("✅ Banner generat amb %s estacions (%s regenerades, %s de la caché)",
+                station_count, fragment_cache.misses, fragment_cache.hits)
+
+    # 3. Escriptures a disc: dades, històric/SQLite i HTML
+    with metrics.stage('store'):
+        if not skip_scrape:
+            if not meteo_scraper.save_data(data):
+                return None
+            meteo_scraper.store_run(data, db_path)
+
+    with metrics.stage('write'):
+        generate_banner.write_banner(html, feed=feed, previous_feed=previous_feed, fragment_cache=fragment_cache)
+        fragment_cache.save()
+        if RSS_CONFIG.get('enabled', False):
+            added, changed = rss_feed.update_feed(data)
+            if changed:
+                logger.info("📰 Feed RSS: %s ítems nous", added)
+            else:
+                logger.info("⏭️  Feed RSS sense canvis")
+
+    if not skip_scrape:
+        meteo_scraper.log_summary(data)
+        if instrumented:
+            meteo_scraper.export_metrics(metrics)
+    metrics.log_stages()
+    return metrics.stages
+
+def main():
+    parser = argparse.ArgumentParser(description='Scraping + banner en un sol procés')
+    parser.add_argument('--skip-scrape', action='store_true', help='Reutilitza data/latest_weather.json')
+    parser.add_argument('--workers', type=int, default=None, help='Fils concurrents del scraper')
+    parser.add_argument('--rps', type=float, default=None, help='Peticions per segon a meteo.cat')
+    parser.add_argument('--db', default=None, help='Base de dades SQLite on desar les observacions')
+    parser.add_argument('--no-resume', action='store_true',
+                        help="No reprendre el diari d'una execució interrompuda")
+    parser.add_argument('--source', choices=data_sources.SOURCES, default=None,
+                        help="Origen de les dades (per defecte DATA_SOURCE_CONFIG)")
+    parser.add_argument('--log-level', default=None, help='Nivell de log (per defecte LOGGING_CONFIG)')
+    parser.add_argument('--log-json', action='store_true', help='Logs en format JSON per línia')
+    args = parser.parse_args()
+
+    logging_config.configure_logging(args.log_level, True if args.log_json else None)
+
+    # Perfilador per mostreig opcional (INSTRUMENTATION_CONFIG['profile'] o METEO_PROFILE=1)
+    profiler = instrumentation.SamplingProfiler.from_config()
+    if profiler:
+        profiler.start()
+    try:
+        timings = run_pipeline(args.skip_scrape, args.workers, args.rps, args.db, not args.no_resume,
+                               args.source)
+    finally:
+        if profiler:
+            profiler.stop()
+    return 0 if timings is not None else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Publicació dels fitxers estàtics: minificació i versions precomprimides
+
+Per a cada fitxer publicat (index.html, banner_output.html, feed.json, feed.xml):
+    - L'HTML es minifica (comentaris, espais entre etiquetes, sagnat del CSS/JS)
+    - Opcionalment, es generen els germans .gz i .br (aquest, si hi ha el paquet brotli)
+    - Si el contingut no ha canviat i els germans estan al dia, no es fa res
+
+Els .gz/.br només serveixen per a servidors propis amb fitxers precomprimits
+(nginx gzip_static, el servidor local de l'OBS...) i per això estan desactivats
+per defecte (PUBLISH_CONFIG). GitHub Pages comprimeix per la seva banda i els
+.gz/.br no es pugen al repositori.
+"""
+
+import gzip
+import os
+import re
+from collections import namedtuple
+
+import atomic_io
+import config_banner as cfg
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+PublishResult = namedtuple('PublishResult', ['path', 'written', 'sizes'])
+
+RAW_BLOCK_RE = re.compile(r'(<(script|style|pre|textarea)\b.*?</\2\s*>)', re.DOTALL | re.IGNORECASE)
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+TAG_WHITESPACE_RE = re.compile(r'>\s+<')
+EDGE_WHITESPACE_RE = re.compile(r'(?<=>)\s*\n\s*$|^\s*\n\s*(?=<)')
+WHITESPACE_RE = re.compile(r'\s+')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+
+def _config():
+    return getattr(cfg, 'PUBLISH_CONFIG', {})
+
+def _minify_markup(markup):
+    markup = COMMENT_RE.sub('', markup)
+    # Espais entre etiquetes: desapareixen si hi ha un salt de línia (sagnat), si no queda un espai
+    markup = TAG_WHITESPACE_RE.sub(lambda m: '><' if '\n' in m.group() else '> <', markup)
+    markup = EDGE_WHITESPACE_RE.sub('', markup)  # Sagnat al costat dels blocs <script>/<style>
+    return WHITESPACE_RE.sub(' ', markup)
+
+def _minify_style(block):
+    block = CSS_COMMENT_RE.sub('', block)
+    block = WHITESPACE_RE.sub(' ', block)
+    block = CSS_PUNCTUATION_RE.sub(r'\1', block)
+    return block.replace(': ', ':')
+
+def _minify_script(block):
+    # Només sagnat i línies buides: es mantenen els salts de línia (ASI i comentaris //)
+    lines = (line.strip() for line in block.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+def minify_html(html):
+    """Minificació conservadora de l'HTML del banner"""
+    output = []
+    position = 0
+    for match in RAW_BLOCK_RE.finditer(html):
+        output.append(_minify_markup(html[position:match.start()]))
+        block, tag = match.group(1), match.group(2).lower()
+        if tag == 'style':
+            output.append(_minify_style(block))
+        elif tag == 'script':
+            output.append(_minify_script(block))
+        else:
+            output.append(block)
+        position = match.end()
+    output.append(_minify_markup(html[position:]))
+    return ''.join(output).strip() + '\n'
+
+def _sibling_fresh(path, sibling):
+    try:
+        return os.path.getmtime(sibling) >= os.path.getmtime(path)
+    except OSError:
+        return False
+
+def compress_file(path, force=False):
+    """
+    Genera path.gz (i path.br si hi ha brotli) si no existeixen o són més antics.
+    Amb la compressió desactivada s'esborren els germans antics, perquè un
+    servidor amb gzip_static no serveixi una versió desfasada
+
+    Returns:
+        dict amb les mides en bytes ('gz', 'br') dels germans
+    """
+    config = _config()
+    sizes = {}
+    with open(path, 'rb') as f:
+        data = None
+        if config.get('gzip', False):
+            gz_path = f"{path}.gz"
+            if force or not _sibling_fresh(path, gz_path):
+                data = f.read()
+                # mtime=0: la mateixa entrada dona sempre els mateixos bytes
+                atomic_io.write_bytes(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+            sizes['gz'] = os.path.getsize(gz_path)
+        else:
+            _remove_sibling(f"{path}.gz")
+        if config.get('brotli', False) and brotli is None:
+            _warn_missing_brotli()
+        if brotli is not None and config.get('brotli', False):
+            br_path = f"{path}.br"
+            if force or not _sibling_fresh(path, br_path):
+                if data is None:
+                    data = f.read()
+                atomic_io.write_bytes(br_path, brotli.compress(data, quality=11))
+            sizes['br'] = os.path.getsize(br_path)
+        else:
+            _remove_sibling(f"{path}.br")
+    return sizes
+
+_brotli_warned = False
+
+def _warn_missing_brotli():
+    global _brotli_warned
+    if not _brotli_warned:
+        print("⚠️  PUBLISH_CONFIG['brotli'] està activat però no hi ha el paquet brotli: no es generen .br")
+        _brotli_warned = True
+
+def _remove_sibling(sibling):
+    try:
+        os.remove(sibling)
+    except FileNotFoundError:
+        pass
+
+def publish(path, content, minify=None):
+    """
+    Escriu un fitxer publicat (minificat si és HTML) i els seus germans comprimits
+
+    Returns:
+        PublishResult(path, written, sizes) amb sizes = {'source', 'minified', 'gz', 'br'}
+    """
+    if minify is None:
+        minify = _config().get('minify_html', True) and path.endswith('.html')
+    sizes = {'source': len(content.encode('utf-8'))}
+    if minify:
+        content = minify_html(content)
+    sizes['minified'] = len(content.encode('utf-8'))
+
+    written = atomic_io.write_if_changed(path, content)
+    sizes.update(compress_file(path, force=written))
+    return PublishResult(path, written, sizes)
+
+def publish_copy(source, destination):
+    """
+    Publica destination com a còpia de source (i dels seus .gz/.br) sense tornar-la
+    a escriure: hardlink + rename atòmic (veure atomic_io.link_or_copy)
+
+    Returns:
+        True si destination ha canviat
+    """
+    changed = atomic_io.link_or_copy(source, destination)
+    for suffix in ('.gz', '.br'):
+        if os.path.exists(source + suffix):
+            atomic_io.link_or_copy(source + suffix, destination + suffix)
+        else:
+            _remove_sibling(destination + suffix)
+    return changed
+
+def _kb(size):
+    return f"{size / 1024:.1f} KB"
+
+def format_sizes(result):
+    """Text del tipus 'index.html: 55.1 KB → 38.0 KB → 6.2 KB gz / 5.3 KB br (-90%)'"""
+    sizes = result.sizes
+    parts = [_kb(sizes['source'])]
+    if sizes.get('minified') not in (None, sizes['source']):
+        parts.append(_kb(sizes['minified']))
+    compressed = [f"{_kb(sizes[kind])} {kind}" for kind in ('gz', 'br') if kind in sizes]
+    if compressed:
+        parts.append(' / '.join(compressed))
+    smallest = min([sizes[kind] for kind in ('minified', 'gz', 'br') if kind in sizes] or [sizes['source']])
+    reduction = 100 * (1 - smallest / sizes['source']) if sizes['source'] else 0
+    return f"{os.path.basename(result.path)}: {' → '.join(parts)} (-{reduction:.0f}%)"
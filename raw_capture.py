@@ -0,0 +1,92 @@
+"""
+Captura de les respostes en brut per a depuració
+Desa els bytes tal com arriben (sense re-serialitzar) des d'un fil en segon pla,
+només per a les estacions indicades o quan l'extracció falla
+
+Els fitxers desats serveixen també de corpus per a benchmarks/bench_parsers.py:
+    python benchmarks/bench_parsers.py --corpus data/raw_capture
+"""
+
+import glob
+import logging
+import os
+import queue
+import threading
+import time
+
+import config_banner as cfg
+
+logger = logging.getLogger(__name__)
+
+class RawCapture:
+    """
+    Escriptor en segon pla de respostes HTML
+
+    Les peticions d'escriptura van a una cua; el fil del scraper no espera mai el disc.
+    """
+
+    def __init__(self, enabled=None, directory=None, stations=None, on_failure=None, max_files=None):
+        config = getattr(cfg, 'RAW_CAPTURE_CONFIG', {})
+        self.enabled = enabled if enabled is not None else config.get('enabled', False)
+        self.directory = directory or config.get('dir', os.path.join(cfg.DATA_DIR, 'raw_capture'))
+        self.stations = set(stations if stations is not None else config.get('stations', []))
+        self.on_failure = on_failure if on_failure is not None else config.get('on_failure', True)
+        self.max_files = max_files if max_files is not None else config.get('max_files', 200)
+        self.captured = 0
+
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if not self.enabled or self._thread:
+            return self
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name='raw-capture', daemon=True)
+        self._thread.start()
+        return self
+
+    def wants(self, station_code, failed=False):
+        """Indica si cal capturar la resposta d'aquesta estació"""
+        if not self.enabled:
+            return False
+        return station_code in self.stations or (failed and self.on_failure)
+
+    def submit(self, station_code, content, reason):
+        """Encua els bytes d'una resposta per desar-los (no bloqueja)"""
+        if not self.enabled or not content:
+            return
+        if not self._thread:
+            self.start()
+        self._queue.put((station_code, content, reason))
+
+    def close(self):
+        """Buida la cua i atura el fil d'escriptura"""
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._prune()
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            station_code, content, reason = item
+            filename = f"{station_code}_{time.strftime('%Y%m%d_%H%M%S')}_{reason}.html"
+            try:
+                with open(os.path.join(self.directory, filename), 'wb') as f:
+                    f.write(content)
+                self.captured += 1
+            except OSError as e:
+                logger.warning("No s'ha pogut desar la captura de %s: %s", station_code, e)
+
+    def _prune(self):
+        """Manté com a màxim max_files captures (elimina les més antigues)"""
+        files = sorted(glob.glob(os.path.join(self.directory, '*.html')), key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
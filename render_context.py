@@ -0,0 +1,103 @@
+"""
+Context de render del banner: l'hora local de Catalunya calculada una sola vegada
+
+Tots els blocs d'una execució fan servir el mateix RenderContext, de manera que
+el text "Actualitzat" és idèntic a totes les estacions i no es recalcula per
+cada una. L'hora local surt de la base de dades de zones horàries (Europe/Madrid);
+la taula de canvis d'horari (CET/CEST) es calcula una vegada per any i es guarda.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:
+    ZoneInfo = None
+
+TIMEZONE_NAME = 'Europe/Madrid'
+STANDARD_OFFSET = timedelta(hours=1)   # CET
+SUMMER_OFFSET = timedelta(hours=2)     # CEST
+
+def _load_zone():
+    if ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(TIMEZONE_NAME)
+    except ZoneInfoNotFoundError:
+        return None  # Sense tzdata (p. ex. Windows sense el paquet tzdata)
+
+ZONE = _load_zone()
+
+def _last_sunday(year, month):
+    day = datetime(year, month, 31, 1, 0, tzinfo=timezone.utc)
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+@lru_cache(maxsize=8)
+def dst_transitions(year):
+    """
+    Canvis d'hora d'un any com a llista ordenada de (instant UTC, offset a partir d'aquell instant)
+
+    Amb tzdata es llegeixen de la zona Europe/Madrid (cerca per dies i després per hores);
+    sense tzdata s'aplica la regla europea: últim diumenge de març i d'octubre a les 01:00 UTC.
+    """
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+    if ZONE is None:
+        return [
+            (start, STANDARD_OFFSET),
+            (_last_sunday(year, 3), SUMMER_OFFSET),
+            (_last_sunday(year, 10), STANDARD_OFFSET)
+        ]
+
+    def offset_at(moment):
+        return moment.astimezone(ZONE).utcoffset()
+
+    transitions = [(start, offset_at(start))]
+    day = start
+    while day.year == year:
+        next_day = day + timedelta(days=1)
+        if offset_at(next_day) != transitions[-1][1]:
+            for hour in range(1, 25):
+                moment = day + timedelta(hours=hour)
+                offset = offset_at(moment)
+                if offset != transitions[-1][1]:
+                    transitions.append((moment, offset))
+                    break
+        day = next_day
+    return transitions
+
+def utc_offset(moment):
+    """Offset de l'hora local de Catalunya per a un instant UTC"""
+    transitions = dst_transitions(moment.year)
+    position = bisect_right([instant for instant, _ in transitions], moment) - 1
+    return transitions[max(0, position)][1]
+
+class RenderContext:
+    """
+    Dades comunes a tots els blocs d'una execució
+
+    Atributs:
+        utc: instant del render (UTC)
+        local: mateix instant en hora local de Catalunya
+        time, date: 'HH:MM' i 'dd/mm/yyyy' en hora local
+        update_text: 'Actualitzat: HH:MM - Data: dd/mm/yyyy'
+    """
+
+    def __init__(self, now=None):
+        utc = now or datetime.now(timezone.utc)
+        if utc.tzinfo is None:
+            utc = utc.replace(tzinfo=timezone.utc)
+        self.utc = utc.astimezone(timezone.utc)
+        self.offset = utc_offset(self.utc)
+        self.local = self.utc.astimezone(timezone(self.offset))
+        self.time = self.local.strftime('%H:%M')
+        self.date = self.local.strftime('%d/%m/%Y')
+        self.update_text = f"Actualitzat: {self.time} - Data: {self.date}"
+
+    @property
+    def is_summer_time(self):
+        return self.offset == SUMMER_OFFSET
+
+    def __repr__(self):
+        return f"RenderContext({self.local.isoformat()})"
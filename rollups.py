@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Agregats diaris i finestres mòbils de l'històric de les estacions (NumPy)
+
+Llegeix els fitxers binaris de historical_store directament com a arrays
+(np.memmap) i manté una caché incremental a data/rollups.npz:
+    - Per estació i dia UTC: TX màxima, TN mínima i PPT del dia (màxim de l'acumulat)
+    - Finestres de 7 i 30 dies: pluja acumulada, mitjana de TX/TN, TX màxima, TN mínima
+    - Agregats de tota la xarxa per dia
+
+Cada execució només llegeix els registres nous de cada estació i només recalcula
+els dies (i les finestres) que aquests registres toquen.
+
+Ús:
+    python rollups.py              # Actualitza la caché i mostra el resum d'avui
+"""
+
+import json
+import os
+import sys
+import warnings
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import atomic_io
+import config_banner as cfg
+import historical_store
+
+WINDOWS = (7, 30)
+DAILY_STATS = ('TX', 'TN', 'PPT')
+SECONDS_PER_DAY = historical_store.SECONDS_PER_DAY
+
+def _record_dtype():
+    return np.dtype([('fetched_at', '<i8'), ('TX', '<f4'), ('TN', '<f4'), ('PPT', '<f4')])
+
+class Rollups:
+    """
+    Matrius [estacions x dies] amb els agregats diaris i les finestres mòbils
+
+    El mateix objecte es pot actualitzar a cada execució (update) i desar (save).
+    """
+
+    def __init__(self, path=None, history_dir=None):
+        if np is None:
+            raise ImportError("rollups.py necessita numpy (pip install numpy)")
+
+        config = getattr(cfg, 'ROLLUPS_CONFIG', {})
+        self.path = path or config.get('file', os.path.join(cfg.DATA_DIR, 'rollups.npz'))
+        self.history_dir = history_dir or cfg.HISTORICAL_DIR
+
+        self.stations = []
+        self.day0 = None
+        self.processed = np.zeros(0, dtype=np.int64)
+        self.daily = {stat: np.empty((0, 0), dtype=np.float32) for stat in DAILY_STATS}
+        self.rolling = {}
+        self.load()
+
+    # ------------------------------------------------------------------
+    # PERSISTÈNCIA
+    # ------------------------------------------------------------------
+    def load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                self.stations = [str(code) for code in data['stations']]
+                self.day0 = int(data['day0'][0]) if data['day0'].size else None
+                self.processed = data['processed'].astype(np.int64)
+                self.daily = {stat: data[f'daily_{stat}'] for stat in DAILY_STATS}
+                self.rolling = {key[len('rolling_'):]: data[key] for key in data.files if key.startswith('rolling_')}
+        except (OSError, KeyError, ValueError):
+            pass
+
+    def save(self):
+        arrays = {
+            'stations': np.array(self.stations, dtype='U8'),
+            'day0': np.array([] if self.day0 is None else [self.day0], dtype=np.int64),
+            'processed': self.processed
+        }
+        arrays.update({f'daily_{stat}': matrix for stat, matrix in self.daily.items()})
+        arrays.update({f'rolling_{key}': matrix for key, matrix in self.rolling.items()})
+
+        with atomic_io.AtomicFile(self.path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @property
+    def n_days(self):
+        return self.daily['TX'].shape[1]
+
+    # ------------------------------------------------------------------
+    # ACTUALITZACIÓ INCREMENTAL
+    # ------------------------------------------------------------------
+    def _row(self, station_code):
+        if station_code in self.stations:
+            return self.stations.index(station_code)
+        self.stations.append(station_code)
+        self.processed = np.append(self.processed, 0)
+        for stat in DAILY_STATS:
+            self.daily[stat] = np.vstack([self.daily[stat], np.full((1, self.n_days), np.nan, dtype=np.float32)])
+        # Les finestres també: si l'estació no té registres nous, _update_rolling no s'executa
+        for key, matrix in self.rolling.items():
+            self.rolling[key] = np.vstack([matrix, np.full((1, matrix.shape[1]), np.nan, dtype=np.float32)])
+        return len(self.stations) - 1
+
+    def _ensure_days(self, first_day, last_day):
+        """Amplia l'eix de dies perquè inclogui [first_day, last_day]"""
+        if self.day0 is None:
+            self.day0 = first_day
+        pad_left = max(0, self.day0 - first_day)
+        pad_right = max(0, last_day - (self.day0 + self.n_days - 1))
+        if pad_left or pad_right:
+            for stat in DAILY_STATS:
+                self.daily[stat] = np.pad(self.daily[stat], ((0, 0), (pad_left, pad_right)), constant_values=np.nan)
+            self.day0 -= pad_left
+        if pad_left:
+            self.rolling = {}  # L'eix s'ha desplaçat: es recalculen totes les finestres
+        return pad_left > 0
+
+    def _read_new_records(self, station_code, row):
+        bin_path = os.path.join(self.history_dir, f"{station_code}.bin")
+        count = historical_store.record_count(station_code, self.history_dir)
+        start = int(self.processed[row])
+        if count < start:
+            # L'històric s'ha reiniciat: es reconstrueix aquesta estació
+            for stat in DAILY_STATS:
+                self.daily[stat][row, :] = np.nan
+            start = 0
+        if count == start:
+            return None, count
+        records = np.memmap(bin_path, dtype=_record_dtype(), mode='r',
+                            offset=historical_store.HEADER.size + start * _record_dtype().itemsize,
+                            shape=(count - start,))
+        return np.array(records), count
+
+    def update(self, station_codes=None):
+        """
+        Incorpora els registres nous de l'històric
+
+        Args:
+            station_codes: Estacions a processar (per defecte totes les de STATIONS)
+
+        Returns:
+            Primer dia (número de dia UTC) que s'ha recalculat, o None si no hi ha res nou
+        """
+        if station_codes is None:
+            station_codes = [station['code'] for station in cfg.STATIONS]
+
+        first_touched = None
+        for station_code in station_codes:
+            row = self._row(station_code)
+            records, count = self._read_new_records(station_code, row)
+            if records is None:
+                continue
+
+            days = records['fetched_at'] // SECONDS_PER_DAY
+            if self._ensure_days(int(days.min()), int(days.max())):
+                first_touched = self.day0
+            cols = days - self.day0
+
+            np.fmax.at(self.daily['TX'][row], cols, records['TX'])
+            np.fmin.at(self.daily['TN'][row], cols, records['TN'])
+            np.fmax.at(self.daily['PPT'][row], cols, records['PPT'])  # PPT és l'acumulat del dia
+
+            self.processed[row] = count
+            touched = int(days.min())
+            first_touched = touched if first_touched is None else min(first_touched, touched)
+
+        if first_touched is not None or not self.rolling:
+            self._update_rolling(first_touched if self.rolling else self.day0)
+        return first_touched
+
+    def _update_rolling(self, from_day):
+        """Recalcula les finestres mòbils dels dies >= from_day"""
+        if self.day0 is None or not self.n_days:
+            return
+        start = max(0, from_day - self.day0)
+        n_stations = len(self.stations)
+
+        for window in WINDOWS:
+            padded_start = start - window + 1
+            pad = max(0, -padded_start)
+            segment = {
+                stat: np.pad(self.daily[stat][:, max(0, padded_start):], ((0, 0), (pad, 0)), constant_values=np.nan)
+                for stat in DAILY_STATS
+            }
+            views = {stat: np.lib.stride_tricks.sliding_window_view(m, window, axis=1) for stat, m in segment.items()}
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=RuntimeWarning)
+                ppt_count = np.sum(~np.isnan(views['PPT']), axis=2)
+                results = {
+                    'ppt_sum': np.where(ppt_count > 0, np.nansum(views['PPT'], axis=2), np.nan),
+                    'tx_mean': np.nanmean(views['TX'], axis=2),
+                    'tn_mean': np.nanmean(views['TN'], axis=2),
+                    'tx_max': np.nanmax(views['TX'], axis=2),
+                    'tn_min': np.nanmin(views['TN'], axis=2)
+                }
+
+            for stat, values in results.items():
+                key = f'{stat}_{window}d'
+                matrix = self.rolling.get(key)
+                if matrix is None or matrix.shape != (n_stations, self.n_days):
+                    grown = np.full((n_stations, self.n_days), np.nan, dtype=np.float32)
+                    if matrix is not None:
+                        rows, cols = min(matrix.shape[0], n_stations), min(matrix.shape[1], self.n_days)
+                        grown[:rows, :cols] = matrix[:rows, :cols]
+                    matrix = grown
+                matrix[:, start:] = values.astype(np.float32)
+                self.rolling[key] = matrix
+
+    # ------------------------------------------------------------------
+    # CONSULTES
+    # ------------------------------------------------------------------
+    def day_number(self, day=None):
+        """Número de dia UTC (per defecte, l'últim dia amb dades)"""
+        if day is None:
+            return self.day0 + self.n_days - 1 if self.day0 is not None else None
+        return int(day)
+
+    def station_day(self, station_code, day=None):
+        """Agregats diaris i finestres mòbils d'una estació per a un dia"""
+        day = self.day_number(day)
+        if station_code not in self.stations or day is None:
+            return None
+        row, col = self.stations.index(station_code), day - self.day0
+        if not 0 <= col < self.n_days:
+            return None
+        result = {stat: _clean(self.daily[stat][row, col]) for stat in DAILY_STATS}
+        result.update({key: _clean(matrix[row, col]) for key, matrix in sorted(self.rolling.items())})
+        return result
+
+    def network_day(self, day=None):
+        """Agregats de tota la xarxa per a un dia"""
+        day = self.day_number(day)
+        if day is None or not 0 <= day - self.day0 < self.n_days:
+            return None
+        col = day - self.day0
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            tx, tn, ppt = (self.daily[stat][:, col] for stat in DAILY_STATS)
+            return {
+                'stations_reporting': int(np.sum(~np.isnan(tx) | ~np.isnan(tn) | ~np.isnan(ppt))),
+                'TX_max': _clean(np.nanmax(tx)),
+                'TN_min': _clean(np.nanmin(tn)),
+                'PPT_mean': _clean(np.nanmean(ppt)),
+                'PPT_max': _clean(np.nanmax(ppt))
+            }
+
+    def summary(self, day=None):
+        """Resum JSON-serialitzable d'un dia (per defecte l'últim)"""
+        day = self.day_number(day)
+        if day is None:
+            return {}
+        return {
+            'day': datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).date().isoformat(),
+            'network': self.network_day(day),
+            'stations': {code: self.station_day(code, day) for code in self.stations}
+        }
+
+def _clean(value):
+    value = float(value)
+    return None if value != value else round(value, 1)
+
+def main():
+    """Actualitza la caché de rollups i mostra el resum de l'últim dia"""
+    if np is None:
+        print("❌ Cal numpy per calcular els rollups (pip install numpy)")
+        return 1
+
+    rollups = Rollups()
+    first_touched = rollups.update()
+    rollups.save()
+
+    summary = rollups.summary()
+    if not summary:
+        print("⚠️  No hi ha històric per agregar")
+        return 0
+
+    print(f"📊 Rollups actualitzats ({len(rollups.stations)} estacions, {rollups.n_days} dies)")
+    if first_touched is not None:
+        print(f"   Recalculat des del dia {first_touched - rollups.day0 + 1}/{rollups.n_days}")
+    print(json.dumps(summary['network'], ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Feed RSS 2.0 de les observacions (feed.xml)
+
+Un ítem per cada canvi de valors d'una estació (TX/TN/PPT), amb GUID estable
+codi + hora de l'observació (metadata.observed_at; els registres antics només
+tenen last_fetched). Els ítems es guarden a RSS_CONFIG['state_file'] i
+es limiten per nombre i per antiguitat. L'XML s'escriu en streaming (XMLGenerator)
+a un fitxer temporal i només substitueix feed.xml (rename atòmic) si ha canviat:
+si cap estació canvia, el fitxer és idèntic byte a byte (mateix ETag).
+
+Ús:
+    python rss_feed.py        # Actualitza feed.xml a partir de data/latest_weather.json
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import XMLGenerator
+
+import atomic_io
+import config_banner as cfg
+import publish
+
+STATE_VERSION = 1
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+def _config():
+    return getattr(cfg, 'RSS_CONFIG', {})
+
+def _parse_time(value):
+    observed = datetime.fromisoformat(value)
+    if observed.tzinfo is None:
+        observed = observed.replace(tzinfo=timezone.utc)
+    return observed.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+def _format_value(value, unit):
+    return f"{value}{unit}" if value is not None else "-"
+
+class RssFeed:
+    """Ítems del feed i estat (últims valors publicats per estació)"""
+
+    def __init__(self, path=None, state_file=None, max_items=None, max_age_hours=None):
+        config = _config()
+        self.path = path or config.get('file', os.path.join(cfg.BASE_DIR, 'feed.xml'))
+        self.state_file = state_file or config.get('state_file', os.path.join(cfg.DATA_DIR, 'rss_state.json'))
+        self.max_items = max_items or config.get('max_items', 200)
+        self.max_age_hours = max_age_hours or config.get('max_age_hours', 48)
+        self.items = []       # Més recents primer
+        self.last_values = {}
+        self.added = 0
+
+    def load(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                self.items = state.get('items', [])
+                self.last_values = state.get('last_values', {})
+        except (OSError, ValueError):
+            pass
+        return self
+
+    def save(self):
+        atomic_io.write_json(self.state_file,
+                             {'version': STATE_VERSION, 'items': self.items, 'last_values': self.last_values})
+
+    def update(self, all_data, now=None):
+        """
+        Afegeix un ítem per cada estació de STATIONS amb valors diferents dels últims publicats
+
+        Returns:
+            Nombre d'ítems nous (sense comptar els que ja surten per antiguitat)
+        """
+        stations = all_data.get('stations', {})
+        new_items = []
+        for station in cfg.STATIONS:
+            code = station['code']
+            station_data = stations.get(code)
+            if not station_data or not station_data.get('success'):
+                continue
+            metadata = station_data.get('metadata', {})
+            observed_at = metadata.get('observed_at') or metadata.get('last_fetched')
+            if not observed_at:
+                continue
+
+            values = station_data.get('values', {})
+            current = [values.get('TX'), values.get('TN'), values.get('PPT')]
+            if self.last_values.get(code) == current:
+                continue
+
+            observed = _parse_time(observed_at)
+            new_items.append({
+                'guid': f"{code}-{observed.strftime('%Y%m%dT%H%MZ')}",
+                'code': code,
+                'name': station['display_name'],
+                'link': station_data['metadata'].get('url', ''),
+                'observed': observed.isoformat(),
+                'values': current
+            })
+            self.last_values[code] = current
+
+        known = {item['guid'] for item in self.items}
+        new_items = [item for item in new_items if item['guid'] not in known]
+        self.items = new_items + self.items
+        self._prune(now)
+        new_guids = {item['guid'] for item in new_items}
+        self.added = sum(1 for item in self.items if item['guid'] in new_guids)
+        return self.added
+
+    def _prune(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        oldest = (now - timedelta(hours=self.max_age_hours)).isoformat()
+        self.items = [item for item in self.items if item['observed'] >= oldest][:self.max_items]
+
+    # ------------------------------------------------------------------
+    # ESCRIPTURA XML
+    # ------------------------------------------------------------------
+    def write(self):
+        """
+        Genera feed.xml en streaming; només substitueix el fitxer si ha canviat
+
+        Returns:
+            True si feed.xml s'ha reescrit
+        """
+        config = _config()
+        atomic = atomic_io.AtomicFile(self.path, 'wb', only_if_changed=True)
+        with atomic as f:
+            xml = XMLGenerator(f, encoding='utf-8', short_empty_elements=True)
+            xml.startDocument()
+            rss_attrs = {'version': '2.0'}
+            if config.get('self_url'):
+                rss_attrs['xmlns:atom'] = ATOM_NS
+            xml.startElement('rss', rss_attrs)
+            xml.startElement('channel', {})
+
+            _text_element(xml, 'title', config.get('title', 'Dades meteorològiques - Meteocat'))
+            _text_element(xml, 'link', config.get('link', 'https://www.meteo.cat/'))
+            _text_element(xml, 'description', config.get(
+                'description', 'Temperatura màxima, mínima i pluja acumulada de les estacions de la XEMA'))
+            _text_element(xml, 'language', 'ca')
+            if config.get('self_url'):
+                xml.startElement('atom:link', {'href': config['self_url'], 'rel': 'self',
+                                               'type': 'application/rss+xml'})
+                xml.endElement('atom:link')
+            if self.items:
+                # Data de l'ítem més recent (no l'hora actual): el fitxer no canvia si no hi ha ítems nous
+                _text_element(xml, 'lastBuildDate', format_datetime(datetime.fromisoformat(self.items[0]['observed'])))
+            _text_element(xml, 'ttl', str(config.get('ttl_minutes', 30)))
+
+            for item in self.items:
+                _write_item(xml, item)
+
+            xml.endElement('channel')
+            xml.endElement('rss')
+            xml.endDocument()
+            f.write(b'\n')
+        return atomic.changed
+
+def _text_element(xml, name, text, attrs=None):
+    xml.startElement(name, attrs or {})
+    xml.characters(text)
+    xml.endElement(name)
+
+def _write_item(xml, item):
+    tx, tn, ppt = item['values']
+    observed = datetime.fromisoformat(item['observed'])
+    summary = f"TX {_format_value(tx, '°C')} · TN {_format_value(tn, '°C')} · Pluja {_format_value(ppt, ' mm')}"
+
+    xml.startElement('item', {})
+    _text_element(xml, 'title', f"{item['name']}: {summary}")
+    if item.get('link'):
+        _text_element(xml, 'link', item['link'])
+    _text_element(xml, 'description',
+                  f"{item['name']} ({item['code']}) a les {observed.strftime('%H:%M')} UTC: {summary}")
+    _text_element(xml, 'guid', item['guid'], {'isPermaLink': 'false'})
+    _text_element(xml, 'pubDate', format_datetime(observed))
+    xml.endElement('item')
+
+def update_feed(all_data, now=None):
+    """
+    Actualitza l'estat i feed.xml amb les dades d'una execució del scraper
+
+    Returns:
+        (ítems nous, True si feed.xml ha canviat)
+    """
+    feed = RssFeed().load()
+    added = feed.update(all_data, now)
+    changed = feed.write()
+    if changed or added:
+        feed.save()
+    publish.compress_file(feed.path, force=changed)
+    return added, changed
+
+def main():
+    data_file = cfg.LATEST_DATA_FILE
+    try:
+        with open(data_file, 'r', encoding='utf-8') as f:
+            all_data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ No es poden llegir les dades ({data_file}): {e}")
+        return 1
+
+    added, changed = update_feed(all_data)
+    if changed:
+        print(f"📰 Feed RSS actualitzat: {added} ítems nous")
+    else:
+        print("⏭️  Feed RSS sense canvis")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,27 @@
 #!/usr/bin/env python3
 """
 EXECUTOR DEL BANNER - Versió simplificada
+Crida generate_banner.main() dins del mateix procés (sense subprocess).
+Per fer scraping + banner d'una sola vegada, fes servir pipeline.py.
 """
 
-import subprocess
-import time
 import sys
 
+import generate_banner
+
 def main():
     print("🚀 Iniciant generador de banner...")
-    print("📁 Executant generate_banner.py...")
-    
+
     try:
-        # Executa el script principal
-        result = subprocess.run([sys.executable, "generate_banner.py"], 
-                              capture_output=True, text=True)
-        
-        print(result.stdout)
-        
-        if result.stderr:
-            print("⚠️  Advertències:")
-            print(result.stderr)
-            
-        if result.returncode == 0:
+        if generate_banner.main():
             print("\n✅ Banner generat amb èxit!")
             print("📄 Fitxer: banner_output.html")
             print("🔧 Obre-lo amb el navegador o configura a OBS.")
-        else:
-            print("\n❌ Error generant el banner")
-            
+            return 0
+        print("\n❌ Error generant el banner")
     except Exception as e:
         print(f"❌ Error executant: {e}")
+    return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
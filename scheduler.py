@@ -0,0 +1,157 @@
+"""
+Planificador adaptatiu de peticions per estació
+
+Per a cada estació es recorda quan s'ha descarregat per última vegada, cada
+quant canvien els seus valors i quan li torna a tocar (next_due). L'interval
+s'adapta a cada descàrrega:
+    - si els valors han canviat, es redueix (x decrease, mínim min_interval)
+    - si no han canviat, s'allarga (x growth, màxim max_interval)
+    - si ha fallat, es torna a provar al cap de min_interval
+
+A cada execució només es descarreguen les estacions que toquen, fins a un
+màxim de max_requests_per_run; la resta reutilitzen els valors anteriors.
+Les estacions sense dades, fallides o d'un dia anterior (TX/TN/PPT són
+diaris) tenen prioritat, i si el pressupost les ajorna queden com a fallides:
+els valors d'ahir no es publiquen com si fossin d'avui.
+
+Estat a data/schedule.json:
+    {"version": 1, "stations": {"XJ": {"interval": 1800, "last_fetch": "...",
+     "next_due": "...", "polls": 12, "changes": 5}, ...}}
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import atomic_io
+import config_banner as cfg
+from render_context import RenderContext
+
+SCHEDULE_VERSION = 1
+
+def _config():
+    return getattr(cfg, 'SCHEDULER_CONFIG', {})
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+class Scheduler:
+    """Interval i propera descàrrega de cada estació, persistits en JSON"""
+
+    def __init__(self, path=None, budget=None):
+        config = _config()
+        self.path = path or config.get('file', os.path.join(cfg.DATA_DIR, 'schedule.json'))
+        self.budget = budget if budget is not None else config.get('max_requests_per_run')
+        self.min_interval = config.get('min_interval_minutes', 15) * 60
+        self.max_interval = config.get('max_interval_minutes', 180) * 60
+        self.initial_interval = config.get('initial_interval_minutes', 30) * 60
+        self.growth = config.get('growth', 1.5)
+        self.decrease = config.get('decrease', 0.5)
+        self.stations = {}
+        self.stats = {'due': 0, 'fetched': 0, 'skipped': 0, 'deferred': 0, 'changed': 0}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == SCHEDULE_VERSION:
+                self.stations = state.get('stations', {})
+        except (OSError, ValueError):
+            self.stations = {}
+        return self
+
+    @staticmethod
+    def is_current(previous, now=None):
+        """Indica si el registre anterior és vàlid i del dia local d'avui (es pot reutilitzar)"""
+        if not previous or not previous.get('success'):
+            return False
+        last_fetched = _parse_time(previous.get('metadata', {}).get('last_fetched'))
+        return last_fetched is not None and RenderContext(last_fetched).date == RenderContext(now).date
+
+    def _priority(self, station_code, previous, now):
+        """
+        Prioritat d'una estació (None si no toca): 0 = cal sí o sí, després
+        les més endarrerides respecte al seu interval
+        """
+        if not self.is_current(previous, now):
+            return (0, 0)
+
+        entry = self.stations.get(station_code)
+        next_due = _parse_time(entry.get('next_due')) if entry else None
+        if next_due is None:
+            return (0, 0)
+        if next_due > now:
+            return None
+        overdue = (now - next_due).total_seconds() / max(entry.get('interval', self.initial_interval), 1)
+        return (1, -overdue)
+
+    def select(self, stations, previous_stations, now=None):
+        """
+        Tria les estacions a descarregar en aquesta execució
+
+        Returns:
+            (due, skipped): llistes de configuracions d'estació; les de skipped
+            reutilitzen el registre anterior si is_current() (les ajornades pel
+            pressupost poden no tenir-ne cap d'avui)
+        """
+        now = now or datetime.now(timezone.utc)
+        candidates = []
+        skipped = []
+        for order, station in enumerate(stations):
+            priority = self._priority(station['code'], previous_stations.get(station['code']), now)
+            if priority is None:
+                skipped.append(station)
+            else:
+                candidates.append((priority, order, station))
+        candidates.sort(key=lambda item: item[:2])
+
+        due = [station for _, _, station in candidates]
+        self.stats['due'] = len(due)
+        if self.budget is not None and len(due) > self.budget:
+            deferred = due[self.budget:]
+            due = due[:self.budget]
+            self.stats['deferred'] = len(deferred)
+            skipped.extend(deferred)
+
+        # Mantenir l'ordre de configuració per a les peticions
+        positions = {station['code']: order for order, station in enumerate(stations)}
+        due.sort(key=lambda station: positions[station['code']])
+        self.stats['fetched'] = len(due)
+        self.stats['skipped'] = len(skipped)
+        return due, skipped
+
+    def observe(self, station_code, record, previous=None, now=None):
+        """Actualitza l'interval i la propera descàrrega d'una estació després de descarregar-la"""
+        now = now or datetime.now(timezone.utc)
+        entry = self.stations.setdefault(station_code, {'interval': self.initial_interval, 'polls': 0, 'changes': 0})
+        interval = entry.get('interval', self.initial_interval)
+
+        if not record.get('success'):
+            next_due = now + timedelta(seconds=self.min_interval)
+        else:
+            entry['polls'] += 1
+            # Sense dada anterior encara no se sap cada quant canvia: interval inicial
+            if previous and previous.get('success'):
+                if previous.get('values') == record.get('values'):
+                    interval = min(self.max_interval, interval * self.growth)
+                else:
+                    entry['changes'] += 1
+                    self.stats['changed'] += 1
+                    interval = max(self.min_interval, interval * self.decrease)
+            entry['interval'] = round(interval)
+            entry['last_fetch'] = now.isoformat()
+            next_due = now + timedelta(seconds=interval)
+        entry['next_due'] = next_due.isoformat()
+
+    def retain(self, station_codes):
+        """Elimina l'estat d'estacions que ja no es consulten"""
+        station_codes = set(station_codes)
+        for station_code in list(self.stations):
+            if station_code not in station_codes:
+                del self.stations[station_code]
+
+    def save(self):
+        atomic_io.write_json(self.path, {'version': SCHEDULE_VERSION, 'stations': self.stations}, fsync=False)
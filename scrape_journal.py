@@ -0,0 +1,125 @@
+"""
+Diari (journal) de l'execució del scraper en curs
+
+Cada estació s'afegeix a data/scrape_journal.jsonl en el moment que acaba
+(una línia JSON per estació, append-only). Si l'execució s'interromp, la
+següent reprèn el diari: les estacions amb èxit i recents no es tornen a
+descarregar. Quan latest_weather.json s'ha desat, el diari s'elimina.
+
+La represa és només local: al workflow, actions/cache només desa la caché
+quan el job acaba bé, i aleshores el diari ja s'ha eliminat.
+
+Format:
+    {"journal": 1, "started": "2026-10-18T13:50:00+00:00"}     <- capçalera
+    {"code": "XJ", "at": "...", "record": {...}}                <- una per estació
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import config_banner as cfg
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+def _config():
+    return getattr(cfg, 'JOURNAL_CONFIG', {})
+
+def journal_path():
+    return _config().get('file', os.path.join(cfg.DATA_DIR, 'scrape_journal.jsonl'))
+
+class ScrapeJournal:
+    """Diari append-only dels resultats per estació"""
+
+    def __init__(self, path=None, max_age_minutes=None):
+        config = _config()
+        self.path = path or journal_path()
+        self.max_age = timedelta(minutes=max_age_minutes or config.get('resume_max_age_minutes', 30))
+        self.records = {}
+        self.timestamps = {}
+        self.started = None
+        self.resumed = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    def open(self, resume=True):
+        """
+        Obre el diari; si n'hi ha un d'una execució interrompuda i recent (i resume=True)
+        en carrega els resultats, si no en comença un de nou
+        """
+        if resume and self._load() and self.fresh_records():
+            self.resumed = True
+            self._file = open(self.path, 'a', encoding='utf-8')
+            return self
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.records, self.timestamps = {}, {}
+        self.started = datetime.now(timezone.utc)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write_line({'journal': JOURNAL_VERSION, 'started': self.started.isoformat()})
+        return self
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+        if not lines:
+            return False
+
+        try:
+            header = json.loads(lines[0])
+            started = datetime.fromisoformat(header['started'])
+        except (ValueError, KeyError, TypeError):
+            return False
+        if header.get('journal') != JOURNAL_VERSION:
+            return False
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+                self.records[entry['code']] = entry['record']
+                self.timestamps[entry['code']] = datetime.fromisoformat(entry['at'])
+            except (ValueError, KeyError, TypeError):
+                continue  # Última línia a mitges d'una execució interrompuda
+        self.started = started
+        return True
+
+    def fresh_records(self, now=None):
+        """Resultats del diari que no cal tornar a descarregar (amb èxit i recents)"""
+        now = now or datetime.now(timezone.utc)
+        return {
+            code: record for code, record in self.records.items()
+            if record.get('success') and now - self.timestamps[code] <= self.max_age
+        }
+
+    def append(self, station_code, record):
+        """Afegeix el resultat d'una estació i el fa visible immediatament al fitxer"""
+        at = datetime.now(timezone.utc)
+        with self._lock:
+            self.records[station_code] = record
+            self.timestamps[station_code] = at
+            self._write_line({'code': station_code, 'at': at.isoformat(), 'record': record})
+
+    def _write_line(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+def discard(path=None):
+    """Elimina el diari (un cop latest_weather.json ja s'ha desat)"""
+    try:
+        os.remove(path or journal_path())
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("No s'ha pogut eliminar el diari del scraper: %s", e)
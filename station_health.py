@@ -0,0 +1,137 @@
+"""
+Estat de salut per estació (circuit breaker)
+
+Una estació que falla failure_threshold execucions seguides queda "oberta":
+no es consulta fins que passa el seu cooldown. Llavors es fa una sola petició
+de prova (half_open): un sol intent del scraper, per una sessió sense reintents
+de transport (http_session.create_session(retries=False)), de manera que costa
+com a molt un timeout:
+    - si va bé, l'estació torna a "closed" i es consulta normalment
+    - si falla, es torna a obrir amb el cooldown doblat (fins a max_cooldown)
+
+Així unes quantes estacions mortes no consumeixen els reintents i les esperes
+de cada execució.
+
+Estat a data/station_health.json:
+    {"version": 1, "stations": {"Z1": {"state": "open", "failures": 5,
+     "cooldown": 3600, "next_probe": "...", "last_success": "...",
+     "last_failure": "..."}, ...}}
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import atomic_io
+import config_banner as cfg
+
+HEALTH_VERSION = 1
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+def _config():
+    return getattr(cfg, 'HEALTH_CONFIG', {})
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+class StationHealth:
+    """Circuit breaker per estació, persistit en JSON"""
+
+    def __init__(self, path=None):
+        config = _config()
+        self.path = path or config.get('file', os.path.join(cfg.DATA_DIR, 'station_health.json'))
+        self.failure_threshold = config.get('failure_threshold', 3)
+        self.base_cooldown = config.get('base_cooldown_minutes', 30) * 60
+        self.max_cooldown = config.get('max_cooldown_hours', 24) * 3600
+        self.stations = {}
+        self.tripped = []
+        self.recovered = []
+        self.probed = []
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == HEALTH_VERSION:
+                self.stations = state.get('stations', {})
+        except (OSError, ValueError):
+            self.stations = {}
+        return self
+
+    def state(self, station_code):
+        return self.stations.get(station_code, {}).get('state', CLOSED)
+
+    def allow(self, station_code, now=None):
+        """
+        Indica si es pot consultar l'estació en aquesta execució: tancada, o oberta
+        amb el cooldown ja passat (llavors la petició serà de prova, veure start_probe)
+        """
+        entry = self.stations.get(station_code)
+        if not entry or entry.get('state', CLOSED) == CLOSED:
+            return True
+        now = now or datetime.now(timezone.utc)
+        next_probe = _parse_time(entry.get('next_probe'))
+        return next_probe is None or next_probe <= now
+
+    def is_probe(self, station_code):
+        """La consulta d'una estació no tancada (i permesa per allow) és una petició de prova"""
+        return self.state(station_code) != CLOSED
+
+    def start_probe(self, station_code):
+        """
+        Passa l'estació a half_open quan s'envia de debò la petició de prova (no en
+        allow: el planificador encara la pot ajornar)
+        """
+        self.stations[station_code]['state'] = HALF_OPEN
+        self.probed.append(station_code)
+
+    def record(self, station_code, success, now=None):
+        """Actualitza el breaker amb el resultat d'una estació consultada"""
+        now = now or datetime.now(timezone.utc)
+        entry = self.stations.setdefault(station_code, {'state': CLOSED, 'failures': 0})
+
+        if success:
+            if entry.get('state', CLOSED) != CLOSED:
+                self.recovered.append(station_code)
+            self.stations[station_code] = {'state': CLOSED, 'failures': 0, 'last_success': now.isoformat()}
+            return
+
+        entry['failures'] = entry.get('failures', 0) + 1
+        entry['last_failure'] = now.isoformat()
+        if entry.get('state') == HALF_OPEN:
+            cooldown = min(self.max_cooldown, entry.get('cooldown', self.base_cooldown) * 2)
+        elif entry['failures'] >= self.failure_threshold:
+            cooldown = self.base_cooldown
+            self.tripped.append(station_code)
+        else:
+            return
+        entry['state'] = OPEN
+        entry['cooldown'] = cooldown
+        entry['next_probe'] = (now + timedelta(seconds=cooldown)).isoformat()
+
+    def retain(self, station_codes):
+        """Elimina l'estat d'estacions que ja no es consulten"""
+        station_codes = set(station_codes)
+        for station_code in list(self.stations):
+            if station_code not in station_codes:
+                del self.stations[station_code]
+
+    def summary(self):
+        """Estat dels breakers per a la metadata de l'execució"""
+        open_stations = {code: entry.get('next_probe') for code, entry in self.stations.items()
+                         if entry.get('state') == OPEN}
+        return {
+            'open': open_stations,
+            'probed': list(self.probed),
+            'tripped': list(self.tripped),
+            'recovered': list(self.recovered)
+        }
+
+    def save(self):
+        atomic_io.write_json(self.path, {'version': HEALTH_VERSION, 'stations': self.stations}, fsync=False)
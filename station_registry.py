@@ -0,0 +1,91 @@
+"""
+Registre d'estacions
+
+La llista completa d'estacions (189, actives i no actives) viu a stations.json
+en lloc d'un literal a config_banner.py. Es carrega la primera vegada que algú
+la demana (get_registry), no en importar cap mòdul, i s'indexa per codi i per
+comarca.
+
+Format de stations.json:
+    {"version": 1, "stations": [
+        {"code": "D7", "name": "VINEBRE_D7", "display_name": "Vinebre",
+         "region": null, "active": true}, ...]}
+
+Per activar o desactivar una estació n'hi ha prou de canviar "active".
+"""
+
+import json
+import os
+import threading
+
+# Claus que veuen els consumidors de cfg.STATIONS (les de sempre)
+STATION_KEYS = ('code', 'name', 'display_name')
+
+_registry = None
+_lock = threading.Lock()
+
+class StationRegistry:
+    """Estacions indexades per codi i per comarca"""
+
+    def __init__(self, stations):
+        self.stations = []
+        self.by_code = {}
+        self.by_region = {}
+        for station in stations:
+            code = station['code']
+            if code in self.by_code:
+                raise ValueError(f"Codi d'estació duplicat: {code}")
+            self.stations.append(station)
+            self.by_code[code] = station
+            region = station.get('region')
+            if region:
+                self.by_region.setdefault(region, []).append(station)
+        self._active = [
+            {key: station[key] for key in STATION_KEYS}
+            for station in self.stations if station.get('active', True)
+        ]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('stations', []))
+
+    def __len__(self):
+        return len(self.stations)
+
+    def __contains__(self, code):
+        return code in self.by_code
+
+    def get(self, code, default=None):
+        """Estació pel codi (amb tots els camps), o default"""
+        return self.by_code.get(code, default)
+
+    def display_name(self, code):
+        station = self.by_code.get(code)
+        return station['display_name'] if station else code
+
+    def active(self):
+        """Estacions actives, en l'ordre del fitxer i amb les claus de cfg.STATIONS"""
+        return self._active
+
+    def region(self, name, active_only=True):
+        """Estacions d'una comarca"""
+        stations = self.by_region.get(name, [])
+        return [station for station in stations if station.get('active', True)] if active_only else list(stations)
+
+def registry_path():
+    import config_banner as cfg
+    return getattr(cfg, 'STATIONS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stations.json'))
+
+def get_registry():
+    """Registre compartit; es llegeix de disc la primera vegada"""
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = StationRegistry.load(registry_path())
+    return _registry
+
+def active_stations():
+    return get_registry().active()
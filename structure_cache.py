@@ -0,0 +1,103 @@
+"""
+Memòria de l'estructura de les pàgines de MeteoCat
+Recorda quin patró de taula (o el fallback per text) ha funcionat, el prova
+primer a la següent pàgina i guarda la taxa d'encerts de cada patró
+"""
+
+import json
+import os
+import threading
+
+import atomic_io
+import config_banner as cfg
+from html_parsers import TABLE_PATTERNS
+
+# Claus especials a més dels patrons de taula
+TEXT_KEY = 'text'
+NONE_KEY = 'none'
+
+# Quantes execucions es guarden per veure l'evolució del fallback
+RUN_HISTORY = 50
+
+def pattern_key(pattern):
+    """Clau estable d'un patró: {'class': 'table-dades'} -> 'class=table-dades'"""
+    return ','.join(f"{attr}={value}" for attr, value in sorted(pattern.items()))
+
+class StructureCache:
+    """
+    Preferència apresa de patrons + estadístiques d'encerts, persistides en JSON
+
+    La preferència caduca quan deixa de coincidir 'expire_after' pàgines seguides;
+    aleshores passa a ser el patró que ha funcionat darrerament.
+    """
+
+    def __init__(self, path=None, expire_after=None, patterns=TABLE_PATTERNS):
+        config = getattr(cfg, 'STRUCTURE_CACHE_CONFIG', {})
+        self.path = path or config.get('file', os.path.join(cfg.DATA_DIR, 'structure_cache.json'))
+        self.expire_after = expire_after if expire_after is not None else config.get('expire_after', 3)
+        self.patterns = list(patterns)
+        self._lock = threading.Lock()
+
+        self.state = {'preferred': None, 'misses_in_row': 0, 'totals': {}, 'runs': []}
+        self.run_counts = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        """Tanca l'execució actual (afegeix-la a l'historial) i desa l'estat"""
+        with self._lock:
+            self.state['runs'] = (self.state['runs'] + [self.run_summary()])[-RUN_HISTORY:]
+            atomic_io.write_json(self.path, self.state, fsync=False)
+
+    def ordered_patterns(self):
+        """Patrons de taula amb el preferit al davant"""
+        preferred = self.state.get('preferred')
+        first = [p for p in self.patterns if pattern_key(p) == preferred]
+        return first + [p for p in self.patterns if pattern_key(p) != preferred]
+
+    def record(self, key):
+        """
+        Registra el mètode que ha funcionat en una pàgina
+
+        Args:
+            key: pattern_key(patró), TEXT_KEY o NONE_KEY si no s'ha trobat res
+        """
+        with self._lock:
+            self.run_counts[key] = self.run_counts.get(key, 0) + 1
+            totals = self.state['totals']
+            totals[key] = totals.get(key, 0) + 1
+
+            if key == NONE_KEY:
+                return
+
+            if key == self.state.get('preferred'):
+                self.state['misses_in_row'] = 0
+                return
+
+            self.state['misses_in_row'] += 1
+            if self.state.get('preferred') is None or self.state['misses_in_row'] >= self.expire_after:
+                self.state['preferred'] = key
+                self.state['misses_in_row'] = 0
+
+    def run_summary(self):
+        """Taxa d'encerts per patró i ús del fallback en l'execució actual"""
+        total = sum(self.run_counts.values())
+        hit_rates = {key: round(count / total, 3) for key, count in sorted(self.run_counts.items())} if total else {}
+        fallback = self.run_counts.get(TEXT_KEY, 0) + self.run_counts.get(NONE_KEY, 0)
+        return {
+            'pages': total,
+            'preferred': self.state.get('preferred'),
+            'hit_rates': hit_rates,
+            'fallback_rate': round(fallback / total, 3) if total else 0.0
+        }
+
+    def baseline_fallback_rate(self):
+        """Mitjana del fallback a les execucions anteriors (per detectar pics)"""
+        rates = [run['fallback_rate'] for run in self.state['runs'] if run.get('pages')]
+        return sum(rates) / len(rates) if rates else None
@@ -0,0 +1,159 @@
+"""
+Orígens de dades contra el servidor local (benchmarks/stub_server.py): l'API de
+la XEMA amb lectures sintètiques i les pàgines d'estació per al scraping web
+"""
+
+import copy
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+import config_banner as cfg
+import data_sources
+from render_context import RenderContext
+from run_benchmark import isolate_config
+from stub_server import StubServer, api_readings
+
+API_KEY = 'test-key'
+
+STATION_PAGE = """<html><body>
+<table class="table-dades">
+<tr><th>Variable</th><th>Valor</th></tr>
+<tr><td>Temperatura màxima</td><td>21,4 °C</td></tr>
+<tr><td>Temperatura mínima</td><td>9,8 °C</td></tr>
+<tr><td>Precipitació acumulada</td><td>1,2 mm</td></tr>
+</table>
+</body></html>""".encode('utf-8')
+
+# Un dia passat (el servidor local només respon 404 per als dies futurs)
+NOW = datetime(2026, 10, 14, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def stub():
+    server = StubServer({'XX': STATION_PAGE}, api_key=API_KEY, seed=1,
+                        api_stations=[station['code'] for station in cfg.STATIONS]).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    """Configuració amb totes les dades i caches al directori temporal"""
+    saved = {name: copy.deepcopy(value) for name, value in vars(cfg).items()
+             if name.endswith('_CONFIG') or name in ('DATA_DIR', 'LATEST_DATA_FILE', 'HISTORICAL_DIR', 'OUTPUT_HTML')}
+    monkeypatch.chdir(tmp_path)
+    isolate_config(cfg, str(tmp_path))
+    yield tmp_path
+    for name, value in saved.items():
+        current = getattr(cfg, name)
+        if isinstance(current, dict):
+            current.clear()
+            current.update(value)
+        else:
+            setattr(cfg, name, value)
+
+def api_source(stub, **kwargs):
+    kwargs.setdefault('api_key', API_KEY)
+    kwargs.setdefault('context', RenderContext(NOW))
+    return data_sources.MeteocatApiSource(api_base=f"{stub.base_url}/xema/v1", **kwargs)
+
+def expected_values(code, context):
+    """TX/TN/PPT del dia local calculats directament de les lectures del servidor"""
+    start = context.local.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+    end = context.utc
+
+    def window(variable):
+        values = []
+        for day in (start.date(), end.date()):
+            for reading in api_readings(code, variable, day):
+                moment = datetime.strptime(reading['data'], '%Y-%m-%dT%H:%MZ').replace(tzinfo=timezone.utc)
+                if start <= moment <= end:
+                    values.append(reading['valor'])
+        return values
+
+    temps, rain = window(32), window(35)
+    return {'TX': round(max(temps), 1), 'TN': round(min(temps), 1), 'PPT': round(sum(rain), 1)}
+
+def test_api_fetch_values(stub):
+    source = api_source(stub)
+    data = source.fetch()
+
+    assert data['metadata']['source'] == 'meteocat_api'
+    assert list(data['stations']) == [station['code'] for station in cfg.STATIONS]
+    # Consultes massives: 2 dies UTC x 2 variables, sigui quin sigui el nombre d'estacions
+    assert source.stats['requests'] == 4
+    assert stub.stats['api'] == 4
+
+    context = RenderContext(NOW)
+    for code, record in data['stations'].items():
+        assert record['success']
+        assert record['values'] == expected_values(code, context)
+        assert record['metadata']['observed_at'] == NOW.isoformat()
+
+@pytest.mark.parametrize('headers, status', [({}, 401), ({'X-Api-Key': 'wrong'}, 403)])
+def test_api_rejected_key(stub, headers, status):
+    source = api_source(stub)
+    session = requests.Session()
+    session.headers.update(headers)
+    with pytest.raises(data_sources.DataSourceError, match=str(status)):
+        source._get(session, source.url(32, NOW.date()))
+
+def test_api_wrong_key_fetch(stub):
+    with pytest.raises(data_sources.DataSourceError):
+        api_source(stub, api_key='wrong').fetch()
+    assert stub.stats['unauthorized'] == 1
+
+def test_api_missing_day(stub):
+    # Dies futurs: el servidor respon 404 i les estacions queden sense lectures, sense error
+    future = datetime.now(timezone.utc) + timedelta(days=3)
+    source = api_source(stub, context=RenderContext(future))
+    data = source.fetch()
+
+    assert stub.stats['not_found'] == 4
+    assert all(not record['success'] for record in data['stations'].values())
+
+@pytest.mark.parametrize('payload', [
+    {'codi': 'D7'},
+    [{'variables': [{'lectures': [{'data': '2026-10-14T10:00Z', 'valor': 1.0}]}]}],
+    [{'codi': 'D7', 'variables': [{'lectures': [{'valor': 1.0}]}]}],
+    [{'codi': 'D7', 'variables': [{'lectures': [{'data': 'ahir', 'valor': 1.0}]}]}],
+    ['D7']
+])
+def test_api_malformed_payload(stub, monkeypatch, payload):
+    source = api_source(stub)
+    monkeypatch.setattr(source, '_get', lambda session, url: payload)
+    with pytest.raises(data_sources.DataSourceError):
+        source.fetch()
+
+def test_auto_falls_back_to_web(stub, isolated, monkeypatch):
+    monkeypatch.setattr(cfg, 'API_KEY', 'wrong')
+    monkeypatch.setitem(cfg.METEOcat_CONFIG, 'api_base', f"{stub.base_url}/xema/v1")
+    monkeypatch.setitem(cfg.SCRAPER_CONFIG, 'base_url', stub.base_url)
+    if hasattr(cfg, 'SCHEDULER_CONFIG'):
+        monkeypatch.setitem(cfg.SCHEDULER_CONFIG, 'enabled', False)
+
+    assert isinstance(data_sources.get_source('auto'), data_sources.MeteocatApiSource)
+    data = data_sources.fetch_data('auto', max_workers=4, requests_per_second=0)
+
+    assert stub.stats['unauthorized'] == 1
+    assert data['metadata']['source'] == 'meteocat_web_scraping'
+    assert len(data['stations']) == len(cfg.STATIONS)
+    assert all(record['values'] == {'TX': 21.4, 'TN': 9.8, 'PPT': 1.2} for record in data['stations'].values())
+
+def test_explicit_api_does_not_fall_back(stub, monkeypatch):
+    monkeypatch.setattr(cfg, 'API_KEY', 'wrong')
+    monkeypatch.setitem(cfg.METEOcat_CONFIG, 'api_base', f"{stub.base_url}/xema/v1")
+    with pytest.raises(data_sources.DataSourceError):
+        data_sources.fetch_data('api')
+    assert stub.stats['ok'] == 0
+
+def test_auto_without_key_uses_web(monkeypatch):
+    monkeypatch.setattr(cfg, 'API_KEY', None)
+    assert isinstance(data_sources.get_source('auto'), data_sources.WebScraperSource)
+
+def test_incomplete_source_fails_on_creation():
+    class NoFetch(data_sources.DataSource):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        NoFetch()
@@ -8,7 +8,10 @@ import os
 import sys
 from datetime import datetime
 
+import atomic_io
+import banner_template
 import config_banner as cfg
+from render_context import RenderContext
 
 def load_latest_data():
     """Carrega les dades més recents del fitxer JSON"""
@@ -24,18 +27,24 @@ def load_latest_data():
         return None
 
 def read_html_template():
-    """Llegeix la plantilla HTML"""
+    """Llegeix la plantilla HTML ja compilada (veure banner_template.py)"""
     try:
-        with open(cfg.HTML_TEMPLATE, 'r', encoding='utf-8') as f:
-            return f.read()
+        return banner_template.load_template(cfg.HTML_TEMPLATE)
     except FileNotFoundError:
         print(f"❌ No es troba la plantilla: {cfg.HTML_TEMPLATE}")
         return None
+    except banner_template.TemplateError as e:
+        print(f"❌ Plantilla no vàlida: {e}")
+        return None
 
-def create_station_html(station_config, station_data, index):
+def create_station_html(station_config, station_data, index, context=None):
     """
     Crea el bloc HTML per una estació amb dades reals
+    
+    Args:
+        context: RenderContext de l'execució (mateix "Actualitzat" per a totes les estacions)
     """
+    context = context or RenderContext()
     code = station_config['code']
     display_name = station_config['display_name']
     
@@ -56,7 +65,7 @@ def create_station_html(station_config, station_data, index):
     
     html = f'''
             <!-- GRUP: {display_name} -->
-            <div class="{css_class}" id="station{index}">
+            <div class="{css_class}" id="station{index}" data-station="{code}">
                 <div class="location-header">
                     <div class="location-name">{display_name}</div>
                 </div>
@@ -79,86 +88,40 @@ def create_station_html(station_config, station_data, index):
                 </div>
                 
                 <div class="footer">
-                    <div class="update-info">{cfg.get_update_text()}</div>
+                    <div class="update-info">{context.update_text}</div>
                     <div class="source">Font: https://www.meteo.cat/</div>
                 </div>
             </div>
 '''
     return html
 
-def generate_banner_html(weather_data):
+def generate_banner_html(weather_data, context=None):
     """
     Genera l'HTML complet del banner amb totes les estacions
-    VERSIÓ TOLERANT: Substitueix tot entre scroll-container
+    VERSIÓ TOLERANT: Substitueix tot el contingut del scroll-container
     """
     template = read_html_template()
     if template is None:
         return None
     
     stations_data = weather_data.get('stations', {}) if weather_data else {}
+    context = context or RenderContext()
     
     # Generar HTML de TOTES les estacions
-    all_stations_html = ""
+    fragments = []
     for i, station_config in enumerate(cfg.STATIONS):
         station_code = station_config['code']
         station_data = stations_data.get(station_code, {})
-        all_stations_html += create_station_html(station_config, station_data, i) + "\n\n"
-    
-    # --- PART CLAU: SUBSTITUIR DES DE '<div class="scroll-container">' FINS AL FINAL ---
-    start_marker = '<div class="scroll-container">'
-    
-    # Trobar la posició inicial
-    start_index = template.find(start_marker)
-    if start_index == -1:
-        print("❌ No s'ha trobat l'inici del scroll-container")
-        return None
-    
-    # Buscar la posició on comença el tancament del contenidor scroll
-    # Primer trobem el proper '</div>' després del nostre marcador
-    end_search_start = start_index + len(start_marker)
-    
-    # Fem una cerca simple: trobar el primer '</div>' després del marcador
-    end_index = template.find('</div>', end_search_start)
-    
-    if end_index == -1:
-        print("❌ No s'ha trobat el final del contenidor")
-        return None
-    
-    # Ara retrocedim per assegurar-nos que aquest és el tancament del scroll-container
-    # Comptem quants '<div' hi ha entre start_index i end_index
-    temp_section = template[start_index:end_index]
-    div_count = temp_section.count('<div')
-    
-    # Si hi ha més d'un div obert, trobem el tancament corresponent
-    if div_count > 1:
-        # Busquem el tancament que iguala el nombre de divs oberts
-        close_tags_needed = div_count
-        current_pos = end_index
-        close_tags_found = 0
-        
-        while close_tags_found < close_tags_needed:
-            next_close = template.find('</div>', current_pos + 1)
-            if next_close == -1:
-                break
-            current_pos = next_close
-            close_tags_found += 1
-        
-        end_index = current_pos + len('</div>')
-    
-    # Crear el nou HTML
-    new_html = (
-        template[:start_index + len(start_marker)] +  # Tot fins on comença el scroll
-        "\n" + all_stations_html.strip() + "\n" +     # Els nostres nous grups
-        template[end_index:]                          # Des del final del scroll en endavant
-    )
+        fragments.append(create_station_html(station_config, station_data, i, context))
+    all_stations_html = "\n\n".join(fragments)
     
-    return new_html
+    # Substituir tot el contingut del scroll-container (slot 'stations')
+    return template.render(stations=["\n", all_stations_html.strip(), "\n"])
 
 def save_banner_html(html_content):
     """Guarda l'HTML generat"""
     try:
-        with open(cfg.OUTPUT_HTML, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        atomic_io.write_text(cfg.OUTPUT_HTML, html_content)
         print(f"✅ Banner actualitzat: {cfg.OUTPUT_HTML}")
         return True
     except Exception as e:
@@ -182,7 +145,8 @@ def main():
         }
     
     print("\n[2] Generant HTML amb dades reals...")
-    banner_html = generate_banner_html(weather_data)
+    context = RenderContext()
+    banner_html = generate_banner_html(weather_data, context)
     
     if banner_html is None:
         print("❌ Error generant HTML")
@@ -193,7 +157,7 @@ def main():
         print(f"\n🎉 BANNER ACTUALITZAT AMB ÈXIT")
         print(f"   Fitxer: {cfg.OUTPUT_HTML}")
         print(f"   Estacions: {len(cfg.STATIONS)}")
-        print(f"   {cfg.get_update_text()}")
+        print(f"   {context.update_text}")
         return 0
     else:
         print("\n❌ ERROR ACTUALITZANT BANNER")
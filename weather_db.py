@@ -0,0 +1,194 @@
+"""
+Base de dades SQLite d'observacions (opcional, complement de latest_weather.json)
+
+Una fila per observació, indexada per (station_code, observed_at), escrita en
+una sola transacció per execució. Les consultes agreguen dins de SQLite i
+només retornen el que cal (última lectura, extrems diaris, pluja acumulada).
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import config_banner as cfg
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    station_code TEXT NOT NULL,
+    observed_at  INTEGER NOT NULL,          -- segons UTC
+    tx           REAL,
+    tn           REAL,
+    ppt          REAL,
+    PRIMARY KEY (station_code, observed_at)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_observations_observed_at ON observations (observed_at);
+"""
+
+def _to_epoch(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _to_number(value):
+    return value if isinstance(value, (int, float)) else None
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+class ObservationDB:
+    """Accés a la base de dades d'observacions"""
+
+    def __init__(self, path=None):
+        config = getattr(cfg, 'SQLITE_CONFIG', {})
+        self.path = path or config.get('path', os.path.join(cfg.DATA_DIR, 'observations.db'))
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # ESCRIPTURA
+    # ------------------------------------------------------------------
+    def write_run(self, all_data):
+        """
+        Desa les estacions amb èxit d'una execució del scraper (una transacció)
+
+        Returns:
+            Nombre de files noves
+        """
+        rows = []
+        for station_code, station_data in all_data.get('stations', {}).items():
+            if not station_data.get('success'):
+                continue
+            fetched_at = station_data.get('metadata', {}).get('last_fetched')
+            if not fetched_at:
+                continue
+            values = station_data.get('values', {})
+            rows.append((station_code, _to_epoch(fetched_at), _to_number(values.get('TX')),
+                         _to_number(values.get('TN')), _to_number(values.get('PPT'))))
+
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO observations (station_code, observed_at, tx, tn, ppt) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            return self.conn.total_changes - before
+
+    # ------------------------------------------------------------------
+    # CONSULTES
+    # ------------------------------------------------------------------
+    def latest_readings(self, station_codes=None):
+        """
+        Última lectura de cada estació
+
+        Returns:
+            dict {codi: {'observed_at', 'TX', 'TN', 'PPT'}}
+        """
+        sql = """
+            SELECT o.station_code, o.observed_at, o.tx, o.tn, o.ppt
+            FROM observations o
+            JOIN (SELECT station_code, MAX(observed_at) AS observed_at
+                  FROM observations GROUP BY station_code) last
+              ON last.station_code = o.station_code AND last.observed_at = o.observed_at
+        """
+        params = []
+        if station_codes:
+            sql += f" WHERE o.station_code IN ({','.join('?' * len(station_codes))})"
+            params = list(station_codes)
+
+        return {
+            row['station_code']: {
+                'observed_at': _iso(row['observed_at']),
+                'TX': row['tx'],
+                'TN': row['tn'],
+                'PPT': row['ppt']
+            }
+            for row in self.conn.execute(sql, params)
+        }
+
+    def daily_extremes(self, station_code=None, days=7, now=None):
+        """
+        Màxima de TX, mínima de TN i pluja del dia (màxim de l'acumulat) per dia UTC
+
+        Returns:
+            Llista de dicts ordenada per estació i dia
+        """
+        since = self._since(days, now)
+        sql = """
+            SELECT station_code,
+                   date(observed_at, 'unixepoch') AS day,
+                   MAX(tx) AS tx_max,
+                   MIN(tn) AS tn_min,
+                   MAX(ppt) AS ppt_total,
+                   COUNT(*) AS readings
+            FROM observations
+            WHERE observed_at >= ?
+        """
+        params = [since]
+        if station_code:
+            sql += " AND station_code = ?"
+            params.append(station_code)
+        sql += " GROUP BY station_code, day ORDER BY station_code, day"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def rolling_precipitation(self, window_days=7, station_code=None, days=30, now=None):
+        """
+        Pluja acumulada en finestres mòbils de window_days dies
+
+        La precipitació de MeteoCat és l'acumulat del dia, així que el total
+        diari és el màxim del dia i la finestra és la suma dels totals diaris.
+        """
+        window_days = int(window_days)
+        since = self._since(days + window_days, now)
+        report_from = self._since(days, now) // 86400
+        sql = f"""
+            WITH daily AS (
+                SELECT station_code,
+                       observed_at / 86400 AS day_number,
+                       MAX(ppt) AS ppt_day
+                FROM observations
+                WHERE observed_at >= ? {'AND station_code = ?' if station_code else ''}
+                GROUP BY station_code, day_number
+            ),
+            windows AS (
+                SELECT station_code, day_number, ppt_day,
+                       SUM(ppt_day) OVER (
+                           PARTITION BY station_code ORDER BY day_number
+                           RANGE BETWEEN {window_days - 1} PRECEDING AND CURRENT ROW
+                       ) AS ppt_window
+                FROM daily
+            )
+            SELECT station_code, date(day_number * 86400, 'unixepoch') AS day, ppt_day, ppt_window
+            FROM windows
+            WHERE day_number >= ?
+            ORDER BY station_code, day_number
+        """
+        params = [since] + ([station_code] if station_code else []) + [report_from]
+        return [
+            {'station_code': row['station_code'], 'day': row['day'],
+             'ppt_day': row['ppt_day'], f'ppt_{window_days}d': row['ppt_window']}
+            for row in self.conn.execute(sql, params)
+        ]
+
+    @staticmethod
+    def _since(days, now=None):
+        now = _to_epoch(now) if now is not None else int(datetime.now(timezone.utc).timestamp())
+        return (now // 86400 - int(days) + 1) * 86400